@@ -6,6 +6,16 @@ from email.message import EmailMessage
 import requests
 from dotenv import load_dotenv
 from flask import Flask, jsonify, render_template, request, send_from_directory
+from backend.logic.dca_backtest import MAX_SCENARIOS, parse_scenario, run_backtests
+from backend.logic.exchange_feeds import fetch_quotes, spread
+from backend.logic.history_store import DAY_MS, HistoryStore
+from backend.logic.indicators import DEFAULT_WINDOWS, SeriesIndicators
+from backend.logic.lesson_engine import init_engine
+from backend.logic.market_cache import create_cache
+from backend.logic.market_refresher import MarketRefresher
+from backend.logic.monte_carlo import ProjectionUnavailable, parse_params, project
+from backend.logic.session_store import create_session_interface
+from backend.logic.signal_engine import compute_signals, window_metrics
 from learning_portal.portal_routes import portal
 
 load_dotenv()
@@ -14,17 +24,21 @@ app = Flask(
     __name__, template_folder="templates", static_folder="assets", static_url_path="/assets"
 )
 app.secret_key = os.getenv("SECRET_KEY", "dev_secret_key")
+# Session data stays server-side (SESSION_BACKEND=sqlite|memory|cookie); the cookie is just an ID
+app.session_interface = create_session_interface()
 
 # Register Learning Portal blueprint
 app.register_blueprint(portal)
 
+# Build the lesson catalog (and seed SQLite if enabled) once per worker, not per request
+init_engine()
 
-# Simple in-memory caches to reduce upstream API calls
-_btc_history_cache = {}
-_btc_snapshot_cache = {"data": None, "timestamp": 0}
-_exchange_price_cache = {"data": None, "timestamp": 0}
+
+# Upstream market data cache, shared across workers unless MARKET_CACHE_BACKEND=memory
+_market_cache = create_cache()
 _CACHE_TTL_SECONDS = 300
 _EXCHANGE_CACHE_TTL_SECONDS = 60
+_MARKET_REFRESH_ENABLED = os.getenv("MARKET_REFRESH_ENABLED", "true").lower() != "false"
 
 
 # ------------------------------
@@ -205,16 +219,7 @@ def submit_consulting_request():
 # ------------------------------
 
 
-def _cache_is_valid(cache_entry: dict, ttl: int = _CACHE_TTL_SECONDS) -> bool:
-    return time.time() - cache_entry.get("timestamp", 0) < ttl
-
-
-def _fetch_btc_history(days: str):
-    cache_key = str(days)
-    cached = _btc_history_cache.get(cache_key)
-    if cached and _cache_is_valid(cached):
-        return cached["data"]
-
+def _load_btc_history(days: str):
     url = f"https://api.coingecko.com/api/v3/coins/bitcoin/market_chart"
     params = {"vs_currency": "usd", "days": days, "interval": "daily"}
     response = requests.get(url, params=params, timeout=15)
@@ -223,14 +228,66 @@ def _fetch_btc_history(days: str):
     if not isinstance(payload, dict) or "prices" not in payload:
         raise RuntimeError("Invalid BTC history response")
 
-    _btc_history_cache[cache_key] = {"data": payload["prices"], "timestamp": time.time()}
     return payload["prices"]
 
 
-def _fetch_btc_snapshot():
-    if _cache_is_valid(_btc_snapshot_cache):
-        return _btc_snapshot_cache["data"]
+_history_store = HistoryStore(fetch=_load_btc_history)
+
+
+def _parse_history_days(days: str):
+    """Return the window size in days, or None for the full history."""
+
+    if days == "max":
+        return None
+    window = int(days)
+    if window <= 0:
+        raise ValueError
+    return window
+
+
+# Named chart resolutions accepted by /api/btc/history as an alternative to points=N
+_HISTORY_RESOLUTIONS = {"low": 250, "medium": 500, "high": 1000}
+_MAX_HISTORY_POINTS = 5000
+
+
+def _parse_history_points(args):
+    """Return the LTTB target point count from ``points``/``resolution``, or None for raw data."""
+
+    points = args.get("points")
+    resolution = args.get("resolution")
+    if points is None and resolution is None:
+        return None
+    if points is None:
+        if resolution not in _HISTORY_RESOLUTIONS:
+            raise ValueError
+        return _HISTORY_RESOLUTIONS[resolution]
+    value = int(points)
+    if not 3 <= value <= _MAX_HISTORY_POINTS:
+        raise ValueError
+    return value
+
+
+def _sync_btc_history():
+    return _market_cache.load("btc-history:sync", _CACHE_TTL_SECONDS, _history_store.sync)
+
+
+def _btc_history_view():
+    try:
+        _sync_btc_history()
+    except Exception:  # noqa: BLE001
+        # Serve the stored closes while CoinGecko is unavailable.
+        if _history_store.last_timestamp() is None:
+            raise
+        app.logger.warning("BTC history sync failed; serving stored closes", exc_info=True)
+    return _history_store.view()
 
+
+def _fetch_btc_history(days: str, points=None):
+    first_day = _history_store.first_day(_parse_history_days(days))
+    return _btc_history_view().window_json(first_day, points)
+
+
+def _load_btc_snapshot():
     url = "https://api.coingecko.com/api/v3/coins/bitcoin"
     params = {
         "localization": "false",
@@ -242,18 +299,35 @@ def _fetch_btc_snapshot():
     }
     response = requests.get(url, params=params, timeout=15)
     response.raise_for_status()
-    payload = response.json()
-    _btc_snapshot_cache["data"] = payload
-    _btc_snapshot_cache["timestamp"] = time.time()
-    return payload
+    return response.json()
+
+
+def _fetch_btc_snapshot():
+    return _market_cache.load("btc-snapshot", _CACHE_TTL_SECONDS, _load_btc_snapshot)
 
 
 @app.get("/api/btc/history")
 def btc_history():
     days = request.args.get("days", "max")
     try:
-        history = _fetch_btc_history(days)
-        return jsonify({"prices": history})
+        _parse_history_days(days)
+    except ValueError:
+        return jsonify({"error": "days must be a positive integer or 'max'"}), 400
+    try:
+        points = _parse_history_points(request.args)
+    except ValueError:
+        return (
+            jsonify(
+                {
+                    "error": f"points must be between 3 and {_MAX_HISTORY_POINTS}, "
+                    f"or resolution one of {', '.join(_HISTORY_RESOLUTIONS)}"
+                }
+            ),
+            400,
+        )
+    try:
+        body = _fetch_btc_history(days, points)
+        return app.response_class(body, mimetype="application/json")
     except Exception as exc:  # noqa: BLE001
         return jsonify({"error": f"Unable to load BTC history: {exc}"}), 502
 
@@ -267,92 +341,115 @@ def btc_snapshot():
         return jsonify({"error": f"Unable to load BTC snapshot: {exc}"}), 502
 
 
-def _fetch_exchange_prices():
-    if _cache_is_valid(_exchange_price_cache, _EXCHANGE_CACHE_TTL_SECONDS):
-        return _exchange_price_cache["data"]
+@app.get("/api/signals")
+def signals():
+    days = request.args.get("days", "30")
+    try:
+        window = _parse_history_days(days)
+    except ValueError:
+        return jsonify({"error": "days must be a positive integer or 'max'"}), 400
+    try:
+        view = _btc_history_view()
+        metrics = window_metrics(view, _history_store.first_day(window))
+        if metrics is None:
+            raise RuntimeError("Not enough price history")
+        payload = compute_signals(metrics, _fetch_btc_snapshot())
+    except Exception as exc:  # noqa: BLE001
+        return jsonify({"error": f"Unable to compute signals: {exc}"}), 502
+    payload["days"] = days
+    return jsonify(payload)
+
+
+_btc_indicators = SeriesIndicators()
 
-    exchanges = []
-    errors = []
 
+@app.get("/api/indicators")
+def indicators():
+    requested = request.args.get("windows")
     try:
-        response = requests.get(
-            "https://api.coinbase.com/v2/prices/BTC-USD/spot", timeout=10
-        )
-        response.raise_for_status()
-        payload = response.json()
-        amount = payload.get("data", {}).get("amount")
-        if amount:
-            exchanges.append(
-                {
-                    "exchange": "Coinbase",
-                    "price": float(amount),
-                    "source": "Coinbase spot price",
-                }
-            )
+        windows = [int(w) for w in requested.split(",")] if requested else list(DEFAULT_WINDOWS)
+    except ValueError:
+        windows = None
+    if not windows or any(w not in DEFAULT_WINDOWS for w in windows):
+        supported = ", ".join(str(w) for w in DEFAULT_WINDOWS)
+        return jsonify({"error": f"windows must be a comma-separated subset of {supported}"}), 400
+    try:
+        view = _btc_history_view()
+        report = _btc_indicators.report(view, int(time.time() * 1000) // DAY_MS)
     except Exception as exc:  # noqa: BLE001
-        errors.append(f"Coinbase: {exc}")
-
+        return jsonify({"error": f"Unable to compute indicators: {exc}"}), 502
+    payload = dict(report)
+    payload["windows"] = {str(w): report["windows"][str(w)] for w in windows}
+    return jsonify(payload)
+
+
+@app.post("/api/dca/backtest")
+def dca_backtest():
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return jsonify({"error": "Send a JSON scenario or {\"scenarios\": [...]}."}), 400
+    raw_scenarios = data.get("scenarios", [data])
+    if not isinstance(raw_scenarios, list) or not 1 <= len(raw_scenarios) <= MAX_SCENARIOS:
+        return jsonify({"error": f"scenarios must be a list of 1 to {MAX_SCENARIOS} items"}), 400
     try:
-        response = requests.get(
-            "https://api.binance.com/api/v3/ticker/price", params={"symbol": "BTCUSDT"}, timeout=10
-        )
-        response.raise_for_status()
-        payload = response.json()
-        if "price" in payload:
-            exchanges.append(
-                {
-                    "exchange": "Binance",
-                    "price": float(payload["price"]),
-                    "source": "Binance BTC/USDT ticker",
-                }
-            )
+        scenarios = [parse_scenario(raw) for raw in raw_scenarios]
+    except ValueError as exc:
+        return jsonify({"error": str(exc)}), 400
+    try:
+        view = _btc_history_view()
     except Exception as exc:  # noqa: BLE001
-        errors.append(f"Binance: {exc}")
+        return jsonify({"error": f"Unable to load BTC history: {exc}"}), 502
+    started = time.perf_counter()
+    results = run_backtests(view.timestamps, view.prices, scenarios)
+    return jsonify(
+        {"results": results, "elapsed_ms": round((time.perf_counter() - started) * 1000, 2)}
+    )
 
+
+@app.post("/api/dca/projection")
+def dca_projection():
     try:
-        response = requests.get(
-            "https://api.kraken.com/0/public/Ticker", params={"pair": "XBTUSD"}, timeout=10
-        )
-        response.raise_for_status()
-        payload = response.json().get("result", {})
-        kraken_pair = next(iter(payload.values()), {})
-        last_trade = kraken_pair.get("c", [None])[0]
-        if last_trade:
-            exchanges.append(
-                {
-                    "exchange": "Kraken",
-                    "price": float(last_trade),
-                    "source": "Kraken XBT/USD ticker",
-                }
-            )
+        params = parse_params(request.get_json(silent=True))
+    except ValueError as exc:
+        return jsonify({"error": str(exc)}), 400
+    try:
+        view = _btc_history_view()
     except Exception as exc:  # noqa: BLE001
-        errors.append(f"Kraken: {exc}")
+        return jsonify({"error": f"Unable to load BTC history: {exc}"}), 502
+    if not len(view.prices):
+        return jsonify({"error": "No BTC history is stored yet"}), 502
+    started = time.perf_counter()
+    try:
+        result = project(view, params)
+    except ValueError as exc:
+        return jsonify({"error": str(exc)}), 400
+    except ProjectionUnavailable as exc:
+        return jsonify({"error": f"{exc}; please retry shortly"}), 503, {"Retry-After": "5"}
+    return jsonify({**result, "elapsed_ms": round((time.perf_counter() - started) * 1000, 2)})
 
-    if not exchanges:
-        raise RuntimeError("No exchange prices available")
 
-    low_price = min(item["price"] for item in exchanges)
-    high_price = max(item["price"] for item in exchanges)
-    mid_price = (low_price + high_price) / 2 if high_price and low_price else 0
-    spread_bps = ((high_price - low_price) / mid_price * 10000) if mid_price else 0
+def _load_exchange_prices():
+    quotes, errors, latency = fetch_quotes()
+
+    if not quotes:
+        raise RuntimeError("No exchange prices available")
 
     payload = {
-        "exchanges": exchanges,
+        "exchanges": [quote.to_dict() for quote in quotes],
         "errors": errors,
-        "spread": {
-            "low": low_price,
-            "high": high_price,
-            "basis_points": round(spread_bps, 2),
-            "percent": round((high_price - low_price) / low_price * 100, 4),
-        },
+        "spread": spread(quotes),
+        "latency_ms": latency,
         "timestamp": time.time(),
     }
-
-    _exchange_price_cache["data"] = payload
-    _exchange_price_cache["timestamp"] = time.time()
     return payload
 
 
+def _fetch_exchange_prices():
+    return _market_cache.load(
+        "exchange-prices", _EXCHANGE_CACHE_TTL_SECONDS, _load_exchange_prices
+    )
+
+
 @app.get("/api/exchange-prices")
 def exchange_prices():
     try:
@@ -362,6 +459,26 @@ def exchange_prices():
         return jsonify({"error": f"Unable to load exchange prices: {exc}"}), 502
 
 
+# Keep the hot keys warm so API requests are a cache read in steady state
+_market_refresher = MarketRefresher(_market_cache)
+_market_refresher.add("btc-snapshot", _CACHE_TTL_SECONDS, _load_btc_snapshot)
+_market_refresher.add("exchange-prices", _EXCHANGE_CACHE_TTL_SECONDS, _load_exchange_prices)
+_market_refresher.add("btc-history:sync", _CACHE_TTL_SECONDS, _history_store.sync)
+
+
+@app.before_request
+def _start_market_refresher():
+    if _MARKET_REFRESH_ENABLED:
+        _market_refresher.ensure_running()
+
+
+@app.get("/api/cache/stats")
+def cache_stats():
+    stats = _market_cache.stats()
+    stats["refresh"] = _market_refresher.status()
+    return jsonify(stats)
+
+
 # ------------------------------
 # MAIN ENTRY
 # ------------------------------
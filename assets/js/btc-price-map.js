@@ -8,6 +8,9 @@
   let lastKnownSnapshot = null;
   const CHART_INSTANCES = new Map();
   const API_BASE = 'https://api.coingecko.com/api/v3';
+  // Server-side LTTB presets (250/500/1000 points); a fixed set keeps the history cache shared across devices.
+  const CHART_DEVICE_PIXELS = (window.innerWidth || 1000) * (window.devicePixelRatio || 1);
+  const CHART_RESOLUTION = CHART_DEVICE_PIXELS < 750 ? 'low' : CHART_DEVICE_PIXELS < 1500 ? 'medium' : 'high';
 
   const defaultColors = {
     line: '#1b73ff',
@@ -85,7 +88,7 @@
   }
 
   async function fetchHistoryRange(rangeDays = 'max') {
-    const backendUrl = `/api/btc/history?days=${rangeDays}`;
+    const backendUrl = `/api/btc/history?days=${rangeDays}&resolution=${CHART_RESOLUTION}`;
     const fallbackUrl = `${API_BASE}/coins/bitcoin/market_chart?vs_currency=usd&days=${rangeDays}`;
 
     let data;
@@ -119,23 +122,8 @@
     const cached = getHistoryFromCache(rangeDays);
     if (cached) return cached;
 
-    // Reuse the full history dataset for derived ranges to avoid multiple network calls
-    const numericDays = Number(rangeDays);
-    if (Number.isFinite(numericDays) && numericDays > 0) {
-      try {
-        const fullHistory = await fetchFullHistory();
-        const cutoff = Date.now() - numericDays * 24 * 60 * 60 * 1000;
-        const filtered = fullHistory.filter((point) => point.x >= cutoff);
-
-        if (filtered.length >= 2) {
-          cacheHistory(rangeDays, filtered);
-          return filtered;
-        }
-      } catch (error) {
-        console.warn('Falling back to direct range fetch after full history error', error);
-      }
-    }
-
+    // Each range is downsampled server-side, so fetch it directly instead of
+    // filtering the (already reduced) full history.
     if (HISTORY_PROMISES.has(rangeDays)) return HISTORY_PROMISES.get(rangeDays);
 
     const promise = fetchHistoryRange(rangeDays)
@@ -1,6 +1,11 @@
+const lessonOpenedAt = Date.now();
+
 function markLessonComplete(formId) {
   const form = document.getElementById(formId);
   if (form) {
+    if (form.elements.time_spent) {
+      form.elements.time_spent.value = Math.round((Date.now() - lessonOpenedAt) / 1000);
+    }
     form.submit();
   }
 }
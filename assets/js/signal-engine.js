@@ -51,13 +51,6 @@
     statusEl.style.color = isError ? '#b91c1c' : 'var(--gray-600)';
   }
 
-  function standardDeviation(values) {
-    if (!values.length) return 0;
-    const mean = values.reduce((a, b) => a + b, 0) / values.length;
-    const variance = values.reduce((sum, value) => sum + (value - mean) ** 2, 0) / values.length;
-    return Math.sqrt(variance);
-  }
-
   function clamp(value, min = 0, max = 100) {
     return Math.max(min, Math.min(max, value));
   }
@@ -100,76 +93,38 @@
     outputEls.buffer.textContent = formatUSD(buffer);
   }
 
-  function renderSnapshot(snapshot) {
-    const market = snapshot?.market_data;
-    if (!market) return;
-
-    latestPrice = market.current_price?.usd || 0;
-    const change = market.price_change_percentage_24h || 0;
-    const cap = market.market_cap?.usd || 0;
-    const volume = market.total_volume?.usd || 0;
-    liquidityScore = clamp((volume / cap) * 1200, 0, 100);
+  function renderSignals(signals) {
+    latestPrice = signals.price || 0;
+    latestMomentum = signals.momentum_pct || 0;
+    latestVolatility = signals.volatility || 0;
+    avgPrice30d = signals.avg_price || 0;
+    liquidityScore = signals.scores?.liquidity || 0;
 
+    const change = signals.change_24h_pct || 0;
     priceEl.textContent = formatUSD(latestPrice);
     changeEl.textContent = formatPercent(change);
     changeEl.style.color = change >= 0 ? '#059669' : '#b91c1c';
-    capEl.textContent = formatUSD(cap);
-    volEl.textContent = formatUSD(volume);
-  }
-
-  function computeSignals(historyPrices) {
-    if (!Array.isArray(historyPrices) || historyPrices.length < 2) return;
-    const prices = historyPrices.map((p) => Number(p[1])).filter((p) => Number.isFinite(p));
-    if (!prices.length) return;
-
-    const first = prices[0];
-    const last = prices[prices.length - 1];
-    avgPrice30d = prices.reduce((sum, v) => sum + v, 0) / prices.length;
-    latestMomentum = ((last - first) / first) * 100;
-
-    const returns = [];
-    for (let i = 1; i < prices.length; i += 1) {
-      if (prices[i - 1]) {
-        returns.push(prices[i] / prices[i - 1] - 1);
-      }
-    }
-    latestVolatility = standardDeviation(returns);
+    capEl.textContent = formatUSD(signals.market_cap || 0);
+    volEl.textContent = formatUSD(signals.volume || 0);
 
-    const volatilityPct = latestVolatility * 100;
     momentumEl.textContent = formatPercent(latestMomentum);
-    volatilityEl.textContent = `${volatilityPct.toFixed(2)}% σ`;
-
-    const stabilityScore = clamp(100 - volatilityPct * 18, 10, 100);
-    const momentumScore = clamp(50 + latestMomentum * 0.8, 0, 100);
-    const heatScore = clamp(50 + ((last - avgPrice30d) / avgPrice30d) * 120, 0, 100);
-
-    const confidence = Math.round(
-      momentumScore * 0.35 + stabilityScore * 0.25 + liquidityScore * 0.25 + heatScore * 0.15,
-    );
-
+    volatilityEl.textContent = `${(signals.volatility_pct || 0).toFixed(2)}% σ`;
     liquidityEl.textContent = `${Math.round(liquidityScore)} / 100`;
-    if (confidenceEl) confidenceEl.textContent = `${confidence}`;
+    if (confidenceEl) confidenceEl.textContent = `${signals.confidence}`;
 
-    renderChips(momentumScore, liquidityScore, stabilityScore, heatScore);
+    const scores = signals.scores || {};
+    renderChips(scores.momentum || 0, liquidityScore, scores.stability || 0, scores.heat || 0);
     renderPlan();
   }
 
   async function loadSignals() {
     setStatus('Refreshing live metrics…');
     try {
-      const [snapshotRes, historyRes] = await Promise.all([
-        fetch('/api/btc/snapshot'),
-        fetch('/api/btc/history?days=30'),
-      ]);
-
-      if (!snapshotRes.ok) throw new Error('Snapshot request failed');
-      if (!historyRes.ok) throw new Error('History request failed');
-
-      const snapshot = await snapshotRes.json();
-      const history = await historyRes.json();
+      // Metrics are computed and cached server-side over the stored 30-day history.
+      const response = await fetch('/api/signals?days=30');
+      if (!response.ok) throw new Error('Signals request failed');
 
-      renderSnapshot(snapshot);
-      computeSignals(history.prices || []);
+      renderSignals(await response.json());
       setStatus('Live metrics updated.');
     } catch (error) {
       console.error(error);
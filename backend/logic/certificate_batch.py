@@ -0,0 +1,172 @@
+"""
+Batch certificate rendering for training cohorts.
+Reads a CSV roster (``name,course`` columns; course by id or title) and renders
+every certificate in parallel across cores, writing one image per learner or a
+single multi-page PDF:
+
+    python -m backend.logic.certificate_batch roster.csv --out certificates/
+    python -m backend.logic.certificate_batch roster.csv --pdf cohort.pdf
+"""
+
+import argparse
+import csv
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from dotenv import load_dotenv
+from PIL import Image
+
+from backend.logic.certificate_generator import CANVAS_SIZE, FORMATS, generate_certificate, render_certificate
+from backend.logic.certificate_ids import SigningKeyMissing, sign_certificate, signing_key
+from backend.logic.lesson_engine import list_courses
+
+DEFAULT_BASE_URL = os.getenv("CERT_BASE_URL", "https://adaptbtc.com")
+# Decoded pages held in memory before they are appended to the PDF.
+PDF_PAGES_PER_WRITE = 32
+
+Job = Tuple[int, str, str, str]
+
+
+def read_roster(path: Path) -> List[Job]:
+    """Parse the roster into ``(row, name, course_id, course_title)`` jobs; raises ``ValueError`` on bad rows."""
+
+    courses: Dict[str, Tuple[str, str]] = {}
+    for course in list_courses():
+        courses[course["id"].lower()] = (course["id"], course["title"])
+        courses[course["title"].lower()] = (course["id"], course["title"])
+
+    jobs: List[Job] = []
+    problems: List[str] = []
+    with path.open(newline="", encoding="utf-8-sig") as handle:
+        reader = csv.DictReader(handle)
+        fields = {field.strip().lower() for field in reader.fieldnames or []}
+        if not {"name", "course"} <= fields:
+            raise ValueError("roster needs a header row with 'name' and 'course' columns")
+        for row_number, row in enumerate(reader, start=2):
+            # DictReader files fields beyond the header under None; blank ones are trailing commas.
+            if any(extra.strip() for extra in row.pop(None, None) or ()):
+                problems.append(f"row {row_number}: more fields than the header")
+                continue
+            row = {(key or "").strip().lower(): (value or "").strip() for key, value in row.items()}
+            course = courses.get(row["course"].lower())
+            if not row["name"]:
+                problems.append(f"row {row_number}: missing name")
+            elif course is None:
+                problems.append(f"row {row_number}: unknown course {row['course']!r}")
+            else:
+                jobs.append((row_number, row["name"], course[0], course[1]))
+    if problems:
+        raise ValueError("\n".join(problems))
+    return jobs
+
+
+def _file_name(index: int, name: str, course_id: str, extension: str) -> str:
+    slug = re.sub(r"[^a-z0-9]+", "-", name.lower()).strip("-") or "learner"
+    return f"{index:04d}-{slug}-{course_id}.{extension}"
+
+
+def _verification_url(base_url: str, name: str, course_id: str, issued: date) -> str:
+    return f"{base_url.rstrip('/')}/portal/verify/{sign_certificate(name, course_id, issued)}"
+
+
+def _render_file(task: Tuple[Job, str, str, date]) -> bytes:
+    (_, name, course_id, title), fmt, base_url, issued = task
+    return generate_certificate(name, title, _verification_url(base_url, name, course_id, issued), fmt, issued)
+
+
+def _render_page(task: Tuple[Job, str, str, date]) -> bytes:
+    (_, name, course_id, title), _, base_url, issued = task
+    return render_certificate(name, title, _verification_url(base_url, name, course_id, issued), issued).tobytes()
+
+
+def _render_all(jobs: List[Job], render, fmt: str, base_url: str, workers: int) -> Iterator[bytes]:
+    """Results in roster order; ``workers <= 1`` renders in this process."""
+
+    issued = datetime.utcnow().date()
+    tasks = [(job, fmt, base_url, issued) for job in jobs]
+    if workers <= 1:
+        yield from map(render, tasks)
+        return
+    chunksize = max(1, min(16, len(tasks) // (workers * 4)))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        yield from pool.map(render, tasks, chunksize=chunksize)
+
+
+def write_images(jobs: List[Job], out_dir: Path, fmt: str, base_url: str, workers: int) -> None:
+    out_dir.mkdir(parents=True, exist_ok=True)
+    extension = FORMATS[fmt][2]
+    results = _render_all(jobs, _render_file, fmt, base_url, workers)
+    for index, (job, data) in enumerate(zip(jobs, results), start=1):
+        (out_dir / _file_name(index, job[1], job[2], extension)).write_bytes(data)
+
+
+def write_pdf(jobs: List[Job], pdf_path: Path, base_url: str, workers: int) -> None:
+    pdf_path.parent.mkdir(parents=True, exist_ok=True)
+    pages: List[Image.Image] = []
+    appending = False
+
+    def flush() -> None:
+        nonlocal appending
+        if pages:
+            pages[0].save(pdf_path, "PDF", save_all=True, append_images=pages[1:], append=appending)
+            appending = True
+            pages.clear()
+
+    for raw in _render_all(jobs, _render_page, "png", base_url, workers):
+        pages.append(Image.frombytes("RGB", CANVAS_SIZE, raw))
+        if len(pages) >= PDF_PAGES_PER_WRITE:
+            flush()
+    flush()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Render AdaptBTC certificates for a CSV roster.")
+    parser.add_argument("roster", type=Path, help="CSV with 'name' and 'course' columns")
+    output = parser.add_mutually_exclusive_group(required=True)
+    output.add_argument("--out", type=Path, help="directory for one image per learner")
+    output.add_argument("--pdf", type=Path, help="single multi-page PDF")
+    parser.add_argument("--format", default="png", choices=sorted(FORMATS), help="image format for --out")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument(
+        "--base-url", default=DEFAULT_BASE_URL, help="site root for the /portal/verify links in each QR code"
+    )
+    args = parser.parse_args(argv)
+
+    load_dotenv()
+    try:
+        signing_key()
+    except SigningKeyMissing as exc:
+        print(f"Cannot sign certificates: {exc}", file=sys.stderr)
+        return 1
+    try:
+        jobs = read_roster(args.roster)
+    except (OSError, ValueError) as exc:
+        print(f"Cannot use roster {args.roster}:\n{exc}", file=sys.stderr)
+        return 1
+    if not jobs:
+        print("Roster has no learners.", file=sys.stderr)
+        return 1
+
+    started = time.perf_counter()
+    if args.pdf:
+        write_pdf(jobs, args.pdf, args.base_url, args.workers)
+        target = args.pdf
+    else:
+        write_images(jobs, args.out, args.format, args.base_url, args.workers)
+        target = args.out
+    elapsed = time.perf_counter() - started
+    print(
+        f"Rendered {len(jobs)} certificates to {target} in {elapsed:.2f}s "
+        f"({len(jobs) / elapsed:.1f}/s, {args.workers} workers)"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
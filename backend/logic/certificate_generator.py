@@ -1,6 +1,10 @@
 import io
-from datetime import datetime
+import logging
+import os
+from datetime import date, datetime
+from functools import lru_cache
 from pathlib import Path
+from typing import Optional
 
 import qrcode
 from PIL import Image, ImageDraw, ImageFont
@@ -8,50 +12,88 @@ from PIL import Image, ImageDraw, ImageFont
 BASE_DIR = Path(__file__).resolve().parent.parent
 BRAND_COLOR = (0, 102, 204)
 TEXT_COLOR = (30, 30, 30)
+CANVAS_SIZE = (1200, 800)
+QR_SIZE = 220
+# zlib level 1: the canvas is mostly flat colour, so higher levels cost CPU for little size gain.
+PNG_COMPRESS_LEVEL = 1
+# Output format -> (Pillow format, mimetype, file extension, save options).
+FORMATS = {
+    "png": ("PNG", "image/png", "png", {"compress_level": PNG_COMPRESS_LEVEL}),
+    "webp": ("WEBP", "image/webp", "webp", {"quality": 90, "method": 0}),
+    "jpeg": ("JPEG", "image/jpeg", "jpg", {"quality": 90}),
+}
 
 
-FONT_PATH = str(Path(__file__).resolve().parent / ".." / ".." / "static" / "css" / "OpenSans-Regular.ttf")
+FONT_PATH = os.getenv("CERT_FONT_PATH", str(BASE_DIR.parent / "assets" / "fonts" / "DejaVuSans.ttf"))
 
+logger = logging.getLogger(__name__)
 
+
+@lru_cache(maxsize=None)
 def _load_font(size: int) -> ImageFont.FreeTypeFont:
     try:
         return ImageFont.truetype(FONT_PATH, size)
-    except Exception:
-        return ImageFont.load_default()
+    except OSError:
+        logger.warning("Certificate font %s could not be loaded; using Pillow's built-in font", FONT_PATH)
+        return ImageFont.load_default(size)
 
 
-def generate_certificate(username: str, course_name: str, verification_url: str) -> bytes:
-    width, height = 1200, 800
-    image = Image.new("RGB", (width, height), "white")
-    draw = ImageDraw.Draw(image)
+@lru_cache(maxsize=64)
+def _base_template(course_name: str) -> Image.Image:
+    """Border, title, course line and closing text; everything that is the same for a course."""
 
-    title_font = _load_font(48)
-    subtitle_font = _load_font(28)
-    body_font = _load_font(22)
+    width, height = CANVAS_SIZE
+    image = Image.new("RGB", CANVAS_SIZE, "white")
+    draw = ImageDraw.Draw(image)
 
     draw.rectangle([(50, 50), (width - 50, height - 50)], outline=BRAND_COLOR, width=6)
-    draw.text((width / 2 - 150, 80), "AdaptBTC Certificate", fill=BRAND_COLOR, font=title_font)
+    draw.text((width / 2, 80), "AdaptBTC Certificate", fill=BRAND_COLOR, font=_load_font(48), anchor="ma")
 
-    draw.text((150, 200), f"Awarded to: {username}", fill=TEXT_COLOR, font=subtitle_font)
-    draw.text((150, 260), f"Course: {course_name}", fill=TEXT_COLOR, font=subtitle_font)
-    draw.text((150, 320), f"Date: {datetime.utcnow().strftime('%Y-%m-%d')}", fill=TEXT_COLOR, font=subtitle_font)
-    draw.text(
+    draw.text((150, 260), f"Course: {course_name}", fill=TEXT_COLOR, font=_load_font(28))
+    draw.multiline_text(
         (150, 380),
-        "Congratulations on completing this AdaptBTC learning track. Share this certificate with your network.",
+        "Congratulations on completing this AdaptBTC learning track.\nShare this certificate with your network.",
         fill=TEXT_COLOR,
-        font=body_font,
+        font=_load_font(22),
+        spacing=8,
     )
+    return image
+
 
+@lru_cache(maxsize=256)
+def _qr_image(verification_url: str) -> Image.Image:
     qr = qrcode.QRCode(box_size=8, border=2)
     qr.add_data(verification_url)
     qr.make(fit=True)
     qr_img = qr.make_image(fill_color="black", back_color="white").convert("RGB")
-    qr_size = 220
-    qr_img = qr_img.resize((qr_size, qr_size))
-    image.paste(qr_img, (width - qr_size - 120, height - qr_size - 160))
+    return qr_img.resize((QR_SIZE, QR_SIZE))
 
-    buffer = io.BytesIO()
-    image.save(buffer, format="PNG")
-    buffer.seek(0)
-    return buffer.read()
 
+def render_certificate(
+    username: str, course_name: str, verification_url: str, issued: Optional[date] = None
+) -> Image.Image:
+    issued = issued or datetime.utcnow().date()
+    width, height = CANVAS_SIZE
+    image = _base_template(course_name).copy()
+    draw = ImageDraw.Draw(image)
+
+    subtitle_font = _load_font(28)
+    draw.text((150, 200), f"Awarded to: {username}", fill=TEXT_COLOR, font=subtitle_font)
+    draw.text((150, 320), f"Date: {issued.strftime('%Y-%m-%d')}", fill=TEXT_COLOR, font=subtitle_font)
+
+    image.paste(_qr_image(verification_url), (width - QR_SIZE - 120, height - QR_SIZE - 160))
+    return image
+
+
+def generate_certificate(
+    username: str,
+    course_name: str,
+    verification_url: str,
+    fmt: str = "png",
+    issued: Optional[date] = None,
+) -> bytes:
+    pil_format, _, _, options = FORMATS[fmt]
+    buffer = io.BytesIO()
+    image = render_certificate(username, course_name, verification_url, issued)
+    image.save(buffer, format=pil_format, **options)
+    return buffer.getvalue()
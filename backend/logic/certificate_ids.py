@@ -0,0 +1,147 @@
+"""
+Signed certificate IDs.
+An ID carries the learner name, course id and issue date plus a truncated
+HMAC over them, so verifying a certificate is a stateless signature check.
+Revocations live in an optional SQLite table keyed by the signature; when the
+database file does not exist no connection is opened at all.
+"""
+
+import base64
+import hashlib
+import hmac
+import os
+import sqlite3
+from datetime import date, datetime
+from functools import partial
+from pathlib import Path
+from typing import Dict, Optional
+
+from backend.logic.process_local import ThreadLocalConnection, open_sqlite
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+DEFAULT_DB_PATH = Path(os.getenv("CERT_REVOCATION_PATH", BASE_DIR / "database" / "certificates.db"))
+# Same fallback as app.secret_key; only accepted when FLASK_DEBUG is on.
+DEV_SIGNING_KEY = "dev_secret_key"
+ID_VERSION = b"v1"
+MAC_BYTES = 12
+SEPARATOR = "\x1f"
+
+Certificate = Dict[str, object]
+
+
+def _b64encode(raw: bytes) -> str:
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode("ascii")
+
+
+def _b64decode(text: str) -> bytes:
+    return base64.urlsafe_b64decode(text + "=" * (-len(text) % 4))
+
+
+class SigningKeyMissing(RuntimeError):
+    """Raised when no signing key is configured outside debug mode."""
+
+
+def signing_key() -> str:
+    """CERT_SIGNING_KEY, else SECRET_KEY; read per call so values loaded from ``.env`` are seen."""
+
+    key = os.getenv("CERT_SIGNING_KEY") or os.getenv("SECRET_KEY") or DEV_SIGNING_KEY
+    if key == DEV_SIGNING_KEY and os.getenv("FLASK_DEBUG", "").lower() not in ("1", "true"):
+        raise SigningKeyMissing("set CERT_SIGNING_KEY or SECRET_KEY to sign certificates")
+    return key
+
+
+def _mac(payload: bytes, key: str) -> bytes:
+    return hmac.new(key.encode("utf-8"), ID_VERSION + payload, hashlib.sha256).digest()[:MAC_BYTES]
+
+
+def sign_certificate(name: str, course_id: str, issued: date, key: Optional[str] = None) -> str:
+    """Compact URL-safe ID: ``base64(course|YYYYMMDD|name).base64(hmac)``."""
+
+    key = key or signing_key()
+    payload = SEPARATOR.join((course_id, issued.strftime("%Y%m%d"), name)).encode("utf-8")
+    return f"{_b64encode(payload)}.{_b64encode(_mac(payload, key))}"
+
+
+def decode_certificate(cert_id: str, key: Optional[str] = None) -> Optional[Certificate]:
+    """Fields of a correctly signed ID, or None if it is malformed or the signature does not match.
+
+    Raises :class:`SigningKeyMissing` rather than checking against the public dev key.
+    """
+
+    key = key or signing_key()
+    encoded, _, signature = cert_id.partition(".")
+    try:
+        payload = _b64decode(encoded)
+        mac = _b64decode(signature)
+    except (ValueError, TypeError):
+        return None
+    if len(mac) != MAC_BYTES or not hmac.compare_digest(mac, _mac(payload, key)):
+        return None
+    try:
+        course_id, issued, name = payload.decode("utf-8").split(SEPARATOR, 2)
+        issued_on = datetime.strptime(issued, "%Y%m%d").date()
+    except ValueError:
+        return None
+    return {"name": name, "course_id": course_id, "issued": issued_on, "signature": signature}
+
+
+class RevocationList:
+    """Revoked signatures in ``revoked_certificates``; lookups are a primary-key probe."""
+
+    def __init__(self, path: Optional[Path] = None) -> None:
+        self.path = Path(path or DEFAULT_DB_PATH)
+        self._db = ThreadLocalConnection(partial(open_sqlite, self.path, synchronous=None), setup=self._create_table)
+
+    def _create_table(self, conn: sqlite3.Connection) -> None:
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS revoked_certificates (
+                signature TEXT PRIMARY KEY,
+                revoked_at TEXT NOT NULL,
+                reason TEXT
+            ) WITHOUT ROWID
+            """
+        )
+
+    def is_revoked(self, signature: str) -> bool:
+        if not self.path.exists():
+            return False
+        row = self._db.get().execute(
+            "SELECT 1 FROM revoked_certificates WHERE signature = ?", (signature,)
+        ).fetchone()
+        return row is not None
+
+    def revoke(self, signature: str, reason: str = "") -> None:
+        self._db.get().execute(
+            "INSERT OR REPLACE INTO revoked_certificates (signature, revoked_at, reason) VALUES (?, ?, ?)",
+            (signature, datetime.utcnow().isoformat(timespec="seconds"), reason),
+        )
+
+
+revocations = RevocationList()
+
+
+def verify_certificate(cert_id: str) -> Optional[Certificate]:
+    """Decoded certificate with a ``revoked`` flag, or None when the ID is not genuine."""
+
+    certificate = decode_certificate(cert_id)
+    if certificate is not None:
+        certificate["revoked"] = revocations.is_revoked(certificate["signature"])
+    return certificate
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    parser = argparse.ArgumentParser(description="Revoke an issued certificate.")
+    parser.add_argument("cert_id")
+    parser.add_argument("--reason", default="")
+    args = parser.parse_args()
+    found = decode_certificate(args.cert_id)
+    if found is None:
+        parser.error("not a valid certificate ID")
+    revocations.revoke(found["signature"], args.reason)
+    print(f"Revoked {found['course_id']} certificate for {found['name']} issued {found['issued']}")
@@ -0,0 +1,114 @@
+"""
+Certificate rendering off the request thread.
+Renders run in a small process pool so a burst of downloads cannot starve
+page requests in the gunicorn worker's threads. The number of queued or
+running jobs is capped; beyond that callers get :class:`CertificateQueueFull`
+immediately instead of waiting behind the burst. A pool whose worker died is
+dropped so the next render starts a fresh one.
+"""
+
+import os
+import threading
+import time
+from concurrent.futures.process import BrokenProcessPool
+from datetime import date
+from typing import Optional
+
+from backend.logic.certificate_generator import FORMATS, generate_certificate
+from backend.logic.process_local import SpawnedPool
+
+CERT_WORKERS = int(os.getenv("CERT_WORKERS", "1"))
+CERT_QUEUE_DEPTH = int(os.getenv("CERT_QUEUE_DEPTH", "8"))
+CERT_TIMEOUT_SECONDS = float(os.getenv("CERT_TIMEOUT_SECONDS", "15"))
+
+
+class CertificateQueueFull(RuntimeError):
+    """Raised when ``CERT_QUEUE_DEPTH`` certificate jobs are already pending."""
+
+
+class CertificateRenderer:
+    """Bounded front for :func:`generate_certificate`; ``workers=0`` renders inline."""
+
+    def __init__(
+        self,
+        workers: int = CERT_WORKERS,
+        queue_depth: int = CERT_QUEUE_DEPTH,
+        timeout: float = CERT_TIMEOUT_SECONDS,
+    ) -> None:
+        self.workers = workers
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(max(1, queue_depth))
+        self._pool = SpawnedPool(workers)
+        self.rejected = 0
+
+    def render(
+        self,
+        username: str,
+        course_name: str,
+        verification_url: str,
+        fmt: str = "png",
+        issued: Optional[date] = None,
+    ) -> bytes:
+        """Render one certificate; raises :class:`CertificateQueueFull` when the queue is at capacity."""
+
+        if not self._slots.acquire(blocking=False):
+            self.rejected += 1
+            raise CertificateQueueFull("certificate queue is full")
+        if self.workers <= 0:
+            try:
+                return generate_certificate(username, course_name, verification_url, fmt, issued)
+            finally:
+                self._slots.release()
+        pool = self._pool.get()
+        try:
+            future = pool.submit(generate_certificate, username, course_name, verification_url, fmt, issued)
+        except BaseException as exc:
+            self._slots.release()
+            if isinstance(exc, BrokenProcessPool):
+                self._pool.discard(pool)
+            raise
+        # The slot is held until the job finishes, even if this caller times out first.
+        future.add_done_callback(lambda _: self._slots.release())
+        try:
+            return future.result(timeout=self.timeout)
+        except BrokenProcessPool:
+            self._pool.discard(pool)
+            raise
+
+    def shutdown(self) -> None:
+        self._pool.shutdown()
+
+
+def benchmark(renders: int = 200, concurrency: int = 4, workers: int = 2, fmt: str = "png") -> None:
+    """Print inline vs pooled throughput for ``renders`` certificates from ``concurrency`` threads."""
+
+    from concurrent.futures import ThreadPoolExecutor
+
+    for label, renderer in (
+        ("inline", CertificateRenderer(workers=0, queue_depth=renders)),
+        (f"pool x{workers}", CertificateRenderer(workers=workers, queue_depth=renders)),
+    ):
+        def job(i: int) -> bytes:
+            return renderer.render(f"Learner {i}", "Bitcoin 101", "https://adaptbtc.com/portal/", fmt)
+
+        # Untimed rounds so every worker has its template, font and QR caches warm.
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as threads:
+            list(threads.map(job, range(max(1, workers) * 2)))
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as threads:
+            list(threads.map(job, range(renders)))
+        elapsed = time.perf_counter() - started
+        renderer.shutdown()
+        print(f"{label:>10}: {renders} {fmt} in {elapsed:.2f}s = {renders / elapsed:.1f}/s")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark certificate rendering throughput.")
+    parser.add_argument("--renders", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--format", default="png", choices=sorted(FORMATS))
+    args = parser.parse_args()
+    benchmark(args.renders, args.concurrency, args.workers, args.format)
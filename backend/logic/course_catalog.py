@@ -0,0 +1,125 @@
+"""
+Immutable in-memory index of courses and lessons for the learning portal.
+The catalog is built once from the same rows that seed SQLite, so lesson
+navigation never needs a database round trip.
+"""
+
+import hashlib
+import json
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+CourseRow = Tuple[str, str, str]
+LessonRow = Tuple[str, int, str, str, str, str, str, str]
+
+
+def _digest(value: object) -> str:
+    payload = json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:32]
+
+
+class CourseRecord:
+    __slots__ = ("id", "title", "summary", "lesson_orders")
+
+    def __init__(self, course_id: str, title: str, summary: str, lesson_orders: Tuple[int, ...]) -> None:
+        self.id = course_id
+        self.title = title
+        self.summary = summary
+        self.lesson_orders = lesson_orders
+
+    def to_dict(self) -> Dict[str, object]:
+        return {"id": self.id, "title": self.title, "summary": self.summary}
+
+
+class LessonRecord:
+    __slots__ = (
+        "course_id",
+        "lesson_order",
+        "title",
+        "content",
+        "examples",
+        "glossary",
+        "takeaways",
+        "diagram",
+        "prev_order",
+        "next_order",
+        "digest",
+    )
+
+    def __init__(
+        self,
+        row: LessonRow,
+        prev_order: Optional[int],
+        next_order: Optional[int],
+        digest: str,
+    ) -> None:
+        (
+            self.course_id,
+            self.lesson_order,
+            self.title,
+            self.content,
+            self.examples,
+            self.glossary,
+            self.takeaways,
+            self.diagram,
+        ) = row
+        self.prev_order = prev_order
+        self.next_order = next_order
+        self.digest = digest
+
+    def to_dict(self) -> Dict[str, object]:
+        return {
+            "lesson_order": self.lesson_order,
+            "title": self.title,
+            "content": self.content,
+            "examples": self.examples,
+            "glossary": self.glossary,
+            "takeaways": self.takeaways,
+            "diagram": self.diagram,
+            "course_id": self.course_id,
+        }
+
+    def outline(self) -> Dict[str, object]:
+        return {"lesson_order": self.lesson_order, "title": self.title}
+
+
+class CourseCatalog:
+    """Read-only lookup tables keyed by course id and ``(course_id, lesson_order)``."""
+
+    __slots__ = ("_courses", "_by_title", "_lessons")
+
+    def __init__(self, course_rows: Iterable[CourseRow], lesson_rows: Iterable[LessonRow]) -> None:
+        grouped: Dict[str, List[LessonRow]] = {}
+        for row in lesson_rows:
+            grouped.setdefault(row[0], []).append(row)
+
+        courses: Dict[str, CourseRecord] = {}
+        lessons: Dict[Tuple[str, int], LessonRecord] = {}
+        for course_id, title, summary in course_rows:
+            rows = sorted(grouped.get(course_id, []), key=lambda r: r[1])
+            orders = tuple(r[1] for r in rows)
+            outline = [(course_id, title, summary)] + [(r[1], r[2]) for r in rows]
+            for idx, row in enumerate(rows):
+                prev_order = orders[idx - 1] if idx > 0 else None
+                next_order = orders[idx + 1] if idx + 1 < len(orders) else None
+                digest = _digest([outline, list(row), prev_order, next_order])
+                lessons[(course_id, row[1])] = LessonRecord(row, prev_order, next_order, digest)
+            courses[course_id] = CourseRecord(course_id, title, summary, orders)
+
+        self._courses = courses
+        self._by_title: Sequence[CourseRecord] = tuple(sorted(courses.values(), key=lambda c: c.title))
+        self._lessons = lessons
+
+    def courses(self) -> Sequence[CourseRecord]:
+        return self._by_title
+
+    def course(self, course_id: str) -> Optional[CourseRecord]:
+        return self._courses.get(course_id)
+
+    def lesson(self, course_id: str, lesson_order: int) -> Optional[LessonRecord]:
+        return self._lessons.get((course_id, lesson_order))
+
+    def lessons(self, course_id: str) -> List[LessonRecord]:
+        course = self._courses.get(course_id)
+        if not course:
+            return []
+        return [self._lessons[(course_id, order)] for order in course.lesson_orders]
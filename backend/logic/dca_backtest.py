@@ -0,0 +1,158 @@
+"""
+Dollar-cost-averaging backtests over the stored daily BTC closes.
+Scenarios that share a date window and frequency share one contribution
+schedule; per-scenario work is a scale and offset of the same cumulative
+arrays, so large batches stay cheap.
+"""
+
+import math
+from datetime import date
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from backend.logic.price_series import DAY_MS
+
+FREQUENCIES = ("daily", "weekly", "monthly")
+MAX_SCENARIOS = 100
+# Upper bounds that keep every cumulative series finite (and the response valid JSON).
+MAX_AMOUNT = 1_000_000_000
+MAX_INITIAL_BTC = 21_000_000
+MAX_POINTS = 5000
+
+Scenario = Dict[str, object]
+Result = Dict[str, object]
+
+
+def _parse_day(value: object, field: str) -> Optional[int]:
+    if value in (None, ""):
+        return None
+    try:
+        return date.fromisoformat(str(value)).toordinal() - date(1970, 1, 1).toordinal()
+    except ValueError as exc:
+        raise ValueError(f"{field} must be a YYYY-MM-DD date") from exc
+
+
+def parse_scenario(raw: Dict[str, object]) -> Scenario:
+    """Validate one parameter set; raises ``ValueError`` with a user-facing message."""
+
+    if not isinstance(raw, dict):
+        raise ValueError("each scenario must be an object")
+    try:
+        amount = float(raw.get("amount", 100))
+        initial_btc = float(raw.get("initial_btc", 0))
+        points = int(raw.get("points", 0))
+    except (TypeError, ValueError, OverflowError) as exc:
+        raise ValueError("amount, initial_btc and points must be numbers") from exc
+    if not (math.isfinite(amount) and math.isfinite(initial_btc)):
+        raise ValueError("amount and initial_btc must be finite numbers")
+    if amount <= 0 or initial_btc < 0 or points < 0:
+        raise ValueError("amount must be positive; initial_btc and points cannot be negative")
+    if amount > MAX_AMOUNT or initial_btc > MAX_INITIAL_BTC or points > MAX_POINTS:
+        raise ValueError(
+            f"amount cannot exceed {MAX_AMOUNT:,}, initial_btc {MAX_INITIAL_BTC:,} and points {MAX_POINTS}"
+        )
+    frequency = str(raw.get("frequency", "weekly")).lower()
+    if frequency not in FREQUENCIES:
+        raise ValueError(f"frequency must be one of {', '.join(FREQUENCIES)}")
+    start_day = _parse_day(raw.get("start"), "start")
+    end_day = _parse_day(raw.get("end"), "end")
+    if start_day is not None and end_day is not None and end_day < start_day:
+        raise ValueError("end must not be before start")
+    include_series = raw.get("include_series", True)
+    if not isinstance(include_series, bool):
+        raise ValueError("include_series must be true or false")
+    return {
+        "amount": amount,
+        "frequency": frequency,
+        "start_day": start_day,
+        "end_day": end_day,
+        "initial_btc": initial_btc,
+        "points": points,
+        "include_series": include_series,
+    }
+
+
+def contribution_mask(days: np.ndarray, frequency: str) -> np.ndarray:
+    """Boolean mask of the days on which a contribution is made, starting with the first day."""
+
+    if frequency == "daily":
+        return np.ones(len(days), dtype=bool)
+    if frequency == "weekly":
+        return (days - days[0]) % 7 == 0
+    months = days.astype("datetime64[D]").astype("datetime64[M]")
+    mask = np.empty(len(days), dtype=bool)
+    mask[:1] = True
+    mask[1:] = months[1:] != months[:-1]
+    return mask
+
+
+def _sample(length: int, points: int):
+    """Evenly spaced indices (always keeping the last day), or a full slice."""
+
+    if not points or points >= length:
+        return slice(None)
+    return np.unique(np.linspace(0, length - 1, points).astype(np.int64))
+
+
+def run_backtests(timestamps: np.ndarray, prices: np.ndarray, scenarios: List[Scenario]) -> List[Result]:
+    """Simulate each parsed scenario against the ``(timestamps, prices)`` daily series."""
+
+    days = timestamps // DAY_MS
+    groups: Dict[Tuple[int, int, str], Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]] = {}
+    results: List[Result] = []
+    for scenario in scenarios:
+        start = 0 if scenario["start_day"] is None else int(np.searchsorted(days, scenario["start_day"]))
+        end = len(days) if scenario["end_day"] is None else int(
+            np.searchsorted(days, scenario["end_day"], side="right")
+        )
+        if end - start < 1:
+            results.append({"error": "no price data in the requested date range"})
+            continue
+
+        key = (start, end, scenario["frequency"])
+        if key not in groups:
+            window_prices = np.asarray(prices[start:end], dtype=np.float64)
+            mask = contribution_mask(days[start:end], scenario["frequency"])
+            # Per unit of contribution: cumulative count and BTC bought.
+            unit_count = np.cumsum(mask)
+            unit_btc = np.cumsum(np.where(mask, 1.0 / window_prices, 0.0))
+            groups[key] = (window_prices, unit_count, unit_btc, timestamps[start:end])
+        window_prices, unit_count, unit_btc, window_ts = groups[key]
+
+        amount = scenario["amount"]
+        bought = unit_btc * amount
+        btc = scenario["initial_btc"] + bought
+        invested = unit_count * amount
+        value = btc * window_prices
+        cost_basis = invested / bought
+
+        final_invested = float(invested[-1])
+        final_value = float(value[-1])
+        result: Result = {
+            "frequency": scenario["frequency"],
+            "amount": amount,
+            "start": int(window_ts[0]),
+            "end": int(window_ts[-1]),
+            "summary": {
+                "contributions": int(unit_count[-1]),
+                "invested": round(final_invested, 2),
+                "btc": round(float(btc[-1]), 8),
+                "btc_bought": round(float(bought[-1]), 8),
+                "cost_basis": round(float(cost_basis[-1]), 2),
+                "value": round(final_value, 2),
+                "return_pct": round((float(bought[-1] * window_prices[-1]) / final_invested - 1) * 100, 4),
+            },
+        }
+        if scenario["include_series"]:
+            step = _sample(len(window_ts), scenario["points"])
+            result["series"] = {
+                "timestamps": window_ts[step].tolist(),
+                "price": window_prices[step].tolist(),
+                "btc": np.round(btc[step], 8).tolist(),
+                "invested": np.round(invested[step], 2).tolist(),
+                "value": np.round(value[step], 2).tolist(),
+                "cost_basis": np.round(cost_basis[step], 2).tolist(),
+            }
+        results.append(result)
+    return results
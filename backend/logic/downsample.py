@@ -0,0 +1,45 @@
+"""
+Largest-Triangle-Three-Buckets downsampling for chart payloads.
+Keeps the visual shape of a price series (peaks and troughs) while cutting it
+down to one of the fixed ``resolution`` presets (250/500/1000 points) or an
+explicit ``points=`` count, so cached payloads are shared across clients.
+"""
+
+from typing import Tuple
+
+import numpy as np
+
+
+def lttb(x: np.ndarray, y: np.ndarray, threshold: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Pick ``threshold`` points of ``(x, y)``, always keeping the first and last point.
+
+    Series that are already small enough are returned unchanged.
+    """
+
+    n = len(x)
+    if threshold < 3 or threshold >= n:
+        return x, y
+
+    fx = np.asarray(x, dtype=np.float64)
+    fy = np.asarray(y, dtype=np.float64)
+    every = (n - 2) / (threshold - 2)
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+
+    a = 0
+    for i in range(threshold - 2):
+        # Average of the next bucket is the third triangle vertex.
+        avg_start = int((i + 1) * every) + 1
+        avg_end = min(int((i + 2) * every) + 1, n)
+        avg_x = fx[avg_start:avg_end].mean()
+        avg_y = fy[avg_start:avg_end].mean()
+
+        start = int(i * every) + 1
+        end = int((i + 1) * every) + 1
+        ax, ay = fx[a], fy[a]
+        area = np.abs((ax - avg_x) * (fy[start:end] - ay) - (ax - fx[start:end]) * (avg_y - ay))
+        a = start + int(area.argmax())
+        selected[i + 1] = a
+
+    return x[selected], y[selected]
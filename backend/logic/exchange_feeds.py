@@ -0,0 +1,187 @@
+"""
+Spot price adapters for the exchange comparison tool.
+Each venue is a registered adapter that normalizes its ticker payload into a
+``Quote``. Enabled venues are queried concurrently under one shared deadline so
+a slow exchange only drops its own quote instead of stalling the response.
+"""
+
+import os
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Dict, List, Optional, Sequence, Tuple, Type
+
+import requests
+
+from backend.logic.process_local import LazyExecutor
+
+VENUE_TIMEOUT_SECONDS = 10
+DEADLINE_SECONDS = float(os.getenv("EXCHANGE_DEADLINE_SECONDS", "4"))
+
+# Fan-out pool, created lazily; a pool inherited across fork has no threads.
+_pool = LazyExecutor(lambda: ThreadPoolExecutor(max_workers=8, thread_name_prefix="exchange-feed"))
+
+
+class Quote:
+    __slots__ = ("venue", "symbol", "price", "timestamp", "latency_ms", "source")
+
+    def __init__(
+        self, venue: str, symbol: str, price: float, timestamp: float, latency_ms: float, source: str
+    ) -> None:
+        self.venue = venue
+        self.symbol = symbol
+        self.price = price
+        self.timestamp = timestamp
+        self.latency_ms = latency_ms
+        self.source = source
+
+    def to_dict(self) -> Dict[str, object]:
+        return {
+            "exchange": self.venue,
+            "symbol": self.symbol,
+            "price": self.price,
+            "source": self.source,
+            "timestamp": self.timestamp,
+            "latency_ms": round(self.latency_ms, 1),
+        }
+
+
+class ExchangeAdapter(ABC):
+    """Base class for a venue; subclasses parse one ticker endpoint into a price."""
+
+    key = ""
+    name = ""
+    symbol = ""
+    source = ""
+    default_url = ""
+
+    def __init__(self, base_url: Optional[str] = None) -> None:
+        # Base URLs are overridable (e.g. COINBASE_API_URL) so adapters can hit local stubs.
+        self.base_url = base_url or os.getenv(f"{self.key.upper()}_API_URL", self.default_url)
+
+    @abstractmethod
+    def fetch_price(self, timeout: float) -> Optional[float]:
+        """Current price from the venue, or None when it is unavailable."""
+
+    def quote(self, timeout: float) -> Optional[Quote]:
+        started = time.perf_counter()
+        price = self.fetch_price(timeout)
+        latency_ms = (time.perf_counter() - started) * 1000
+        if price is None:
+            return None
+        return Quote(self.name, self.symbol, price, time.time(), latency_ms, self.source)
+
+
+ADAPTERS: Dict[str, Type[ExchangeAdapter]] = {}
+
+
+def register(adapter: Type[ExchangeAdapter]) -> Type[ExchangeAdapter]:
+    ADAPTERS[adapter.key] = adapter
+    return adapter
+
+
+@register
+class CoinbaseAdapter(ExchangeAdapter):
+    key = "coinbase"
+    name = "Coinbase"
+    symbol = "BTC-USD"
+    source = "Coinbase spot price"
+    default_url = "https://api.coinbase.com"
+
+    def fetch_price(self, timeout: float) -> Optional[float]:
+        response = requests.get(f"{self.base_url}/v2/prices/BTC-USD/spot", timeout=timeout)
+        response.raise_for_status()
+        amount = response.json().get("data", {}).get("amount")
+        return float(amount) if amount else None
+
+
+@register
+class BinanceAdapter(ExchangeAdapter):
+    key = "binance"
+    name = "Binance"
+    symbol = "BTCUSDT"
+    source = "Binance BTC/USDT ticker"
+    default_url = "https://api.binance.com"
+
+    def fetch_price(self, timeout: float) -> Optional[float]:
+        response = requests.get(
+            f"{self.base_url}/api/v3/ticker/price", params={"symbol": self.symbol}, timeout=timeout
+        )
+        response.raise_for_status()
+        payload = response.json()
+        return float(payload["price"]) if "price" in payload else None
+
+
+@register
+class KrakenAdapter(ExchangeAdapter):
+    key = "kraken"
+    name = "Kraken"
+    symbol = "XBTUSD"
+    source = "Kraken XBT/USD ticker"
+    default_url = "https://api.kraken.com"
+
+    def fetch_price(self, timeout: float) -> Optional[float]:
+        response = requests.get(
+            f"{self.base_url}/0/public/Ticker", params={"pair": self.symbol}, timeout=timeout
+        )
+        response.raise_for_status()
+        payload = response.json().get("result", {})
+        kraken_pair = next(iter(payload.values()), {})
+        last_trade = kraken_pair.get("c", [None])[0]
+        return float(last_trade) if last_trade else None
+
+
+def enabled_adapters() -> List[ExchangeAdapter]:
+    """Instantiate the venues listed in EXCHANGE_VENUES (comma separated), or all registered."""
+
+    configured = os.getenv("EXCHANGE_VENUES", "")
+    keys = [key.strip().lower() for key in configured.split(",") if key.strip()] or list(ADAPTERS)
+    return [ADAPTERS[key]() for key in keys if key in ADAPTERS]
+
+
+def fetch_quotes(
+    adapters: Optional[Sequence[ExchangeAdapter]] = None, deadline: float = DEADLINE_SECONDS
+) -> Tuple[List[Quote], List[str], Dict[str, Optional[float]]]:
+    """Query every adapter in parallel and return whatever arrived before ``deadline``.
+
+    Returns ``(quotes, errors, latency_ms)``; venues that miss the deadline or
+    fail are reported in ``errors`` with a latency of ``None``.
+    """
+
+    adapters = enabled_adapters() if adapters is None else adapters
+    timeout = min(VENUE_TIMEOUT_SECONDS, deadline)
+    futures = [(adapter.name, _pool.get().submit(adapter.quote, timeout)) for adapter in adapters]
+    wait([future for _, future in futures], timeout=deadline)
+
+    quotes: List[Quote] = []
+    errors: List[str] = []
+    latency: Dict[str, Optional[float]] = {}
+    for name, future in futures:
+        latency[name] = None
+        if not future.done():
+            future.cancel()
+            errors.append(f"{name}: no response within {deadline:g}s")
+            continue
+        try:
+            quote = future.result()
+        except Exception as exc:  # noqa: BLE001
+            errors.append(f"{name}: {exc}")
+            continue
+        if quote:
+            latency[name] = round(quote.latency_ms, 1)
+            quotes.append(quote)
+    return quotes, errors, latency
+
+
+def spread(quotes: Sequence[Quote]) -> Dict[str, float]:
+    prices = [quote.price for quote in quotes]
+    low_price = min(prices)
+    high_price = max(prices)
+    mid_price = (low_price + high_price) / 2 if high_price and low_price else 0
+    spread_bps = ((high_price - low_price) / mid_price * 10000) if mid_price else 0
+    return {
+        "low": low_price,
+        "high": high_price,
+        "basis_points": round(spread_bps, 2),
+        "percent": round((high_price - low_price) / low_price * 100, 4),
+    }
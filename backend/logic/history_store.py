@@ -0,0 +1,92 @@
+"""
+Local store of daily BTC/USD closes backing /api/btc/history.
+The full history is downloaded once; later syncs only pull the missing tail
+from CoinGecko. SQLite is the append log, and after each sync the closes are
+exported to a memory-mapped columnar file that every worker reads windows from.
+"""
+
+import os
+import sqlite3
+import time
+from functools import partial
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from backend.logic.price_series import PriceSeries, SeriesView, write_series
+from backend.logic.process_local import ThreadLocalConnection, open_sqlite
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+DEFAULT_DB_PATH = BASE_DIR / "database" / "btc_history.db"
+
+DAY_MS = 86_400_000
+
+PricePoint = List[float]
+HistoryFetcher = Callable[[str], List[PricePoint]]
+
+
+class HistoryStore:
+    """Daily closes keyed by UTC day; the newest day is overwritten until it completes."""
+
+    def __init__(self, fetch: HistoryFetcher, path: Optional[Path] = None) -> None:
+        self.fetch = fetch
+        self.path = Path(path or os.getenv("BTC_HISTORY_PATH") or DEFAULT_DB_PATH)
+        self.series = PriceSeries(self.path.with_suffix(".series"))
+        # Default isolation: append() relies on ``with conn`` for its transaction.
+        self._db = ThreadLocalConnection(partial(open_sqlite, self.path, isolation_level="", synchronous=None))
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with sqlite3.connect(self.path, timeout=30) as conn:
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS daily_closes (
+                    day INTEGER PRIMARY KEY,
+                    ts INTEGER NOT NULL,
+                    price REAL NOT NULL
+                );
+                """
+            )
+        conn.close()
+
+    def last_timestamp(self) -> Optional[int]:
+        row = self._db.get().execute("SELECT MAX(ts) FROM daily_closes").fetchone()
+        return row[0] if row else None
+
+    def append(self, points: List[PricePoint]) -> int:
+        rows = [(int(ts) // DAY_MS, int(ts), float(price)) for ts, price in points]
+        conn = self._db.get()
+        with conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO daily_closes (day, ts, price) VALUES (?, ?, ?)", rows
+            )
+        return len(rows)
+
+    def sync(self) -> Dict[str, object]:
+        """Fetch only the days missing since the last stored close (everything when empty)."""
+
+        last_ts = self.last_timestamp()
+        if last_ts is None:
+            days = "max"
+        else:
+            # Re-read the newest stored day as well, since it may have been a partial close.
+            now_day = int(time.time() * 1000) // DAY_MS
+            days = str(max(1, now_day - last_ts // DAY_MS + 1))
+        written = self.append(self.fetch(days))
+        self.export()
+        return {"requested_days": days, "points_written": written, "last_timestamp": self.last_timestamp()}
+
+    def export(self) -> None:
+        """Rewrite the columnar series file from the SQLite log."""
+
+        rows = self._db.get().execute("SELECT ts, price FROM daily_closes ORDER BY day").fetchall()
+        write_series(self.series.path, [row[0] for row in rows], [row[1] for row in rows])
+
+    def view(self) -> SeriesView:
+        view = self.series.current()
+        if view.version is None and self.last_timestamp() is not None:
+            self.export()
+            view = self.series.current()
+        return view
+
+    @staticmethod
+    def first_day(days: Optional[int]) -> Optional[int]:
+        return None if days is None else int(time.time() * 1000) // DAY_MS - days
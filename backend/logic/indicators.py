@@ -0,0 +1,214 @@
+"""
+Rolling-window indicators over the daily BTC close series.
+Each window keeps running sums and a sliding Welford variance, so adding a
+close costs O(windows) instead of a pass over the full history. The latest,
+still-changing daily close is previewed on top of the committed state
+without mutating it.
+"""
+
+import math
+import threading
+from collections import deque
+from typing import Deque, Dict, Iterable, Optional, Sequence, Tuple
+
+import numpy as np
+
+from backend.logic.price_series import DAY_MS, SeriesView
+
+DEFAULT_WINDOWS: Tuple[int, ...] = (7, 30, 90, 365)
+
+Indicators = Dict[str, object]
+
+
+class _Welford:
+    __slots__ = ("n", "mean", "m2")
+
+    def __init__(self, n: int = 0, mean: float = 0.0, m2: float = 0.0) -> None:
+        self.n = n
+        self.mean = mean
+        self.m2 = m2
+
+    def add(self, x: float) -> None:
+        self.n += 1
+        delta = x - self.mean
+        self.mean += delta / self.n
+        self.m2 += delta * (x - self.mean)
+
+    def remove(self, x: float) -> None:
+        if self.n <= 1:
+            self.n, self.mean, self.m2 = 0, 0.0, 0.0
+            return
+        self.n -= 1
+        delta = x - self.mean
+        self.mean -= delta / self.n
+        self.m2 -= delta * (x - self.mean)
+
+    def copy(self) -> "_Welford":
+        return _Welford(self.n, self.mean, self.m2)
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(max(self.m2, 0.0) / self.n) if self.n else 0.0
+
+
+class RollingWindow:
+    """Running state for one window length over closes and their daily returns."""
+
+    __slots__ = ("size", "closes", "close_sum", "returns", "variance", "gains", "losses")
+
+    def __init__(self, size: int) -> None:
+        self.size = size
+        self.closes: Deque[float] = deque()
+        self.close_sum = 0.0
+        self.returns: Deque[float] = deque()
+        self.variance = _Welford()
+        self.gains = 0.0
+        self.losses = 0.0
+
+    def push(self, close: float, ret: Optional[float]) -> None:
+        self.closes.append(close)
+        self.close_sum += close
+        if len(self.closes) > self.size:
+            self.close_sum -= self.closes.popleft()
+        if ret is None:
+            return
+        self.returns.append(ret)
+        self.variance.add(ret)
+        self.gains += max(ret, 0.0)
+        self.losses += max(-ret, 0.0)
+        if len(self.returns) > self.size:
+            old = self.returns.popleft()
+            self.variance.remove(old)
+            self.gains -= max(old, 0.0)
+            self.losses -= max(-old, 0.0)
+
+    def snapshot(self, close: Optional[float] = None, ret: Optional[float] = None) -> Dict[str, float]:
+        """Indicator values, optionally as if ``close``/``ret`` were pushed (state is not changed)."""
+
+        count = len(self.closes)
+        close_sum = self.close_sum
+        variance = self.variance
+        gains, losses = self.gains, self.losses
+        oldest = self.closes[0] if self.closes else None
+        if close is not None:
+            close_sum += close
+            count += 1
+            if count > self.size:
+                close_sum -= self.closes[0]
+                count -= 1
+                oldest = self.closes[1] if len(self.closes) > 1 else close
+            elif oldest is None:
+                oldest = close
+        if ret is not None:
+            variance = variance.copy()
+            variance.add(ret)
+            gains += max(ret, 0.0)
+            losses += max(-ret, 0.0)
+            if len(self.returns) + 1 > self.size:
+                old = self.returns[0]
+                variance.remove(old)
+                gains -= max(old, 0.0)
+                losses -= max(-old, 0.0)
+
+        last = close if close is not None else (self.closes[-1] if self.closes else None)
+        if not count or last is None:
+            return {"points": 0}
+        if losses > 0:
+            rsi = 100 - 100 / (1 + gains / losses)
+        else:
+            rsi = 100.0 if gains > 0 else 50.0
+        std = variance.std
+        return {
+            "points": count,
+            "sma": round(close_sum / count, 2),
+            "momentum_pct": round((last / oldest - 1) * 100, 4) if oldest else 0.0,
+            "volatility_pct": round(std * 100, 4),
+            "annualized_volatility_pct": round(std * math.sqrt(365) * 100, 2),
+            "rsi": round(rsi, 2),
+        }
+
+
+class IndicatorEngine:
+    """Committed indicator state for completed days plus an all-time high."""
+
+    def __init__(self, windows: Sequence[int] = DEFAULT_WINDOWS) -> None:
+        self.windows = {size: RollingWindow(size) for size in windows}
+        self.ath = 0.0
+        self.count = 0
+        self.last_ts: Optional[int] = None
+        self.last_close: Optional[float] = None
+
+    def update(self, ts: int, close: float) -> None:
+        """Commit one completed daily close in O(windows)."""
+
+        ret = close / self.last_close - 1 if self.last_close else None
+        for window in self.windows.values():
+            window.push(close, ret)
+        self.ath = max(self.ath, close)
+        self.count += 1
+        self.last_ts = ts
+        self.last_close = close
+
+    def extend(self, points: Iterable[Tuple[int, float]]) -> None:
+        for ts, close in points:
+            self.update(ts, close)
+
+    def report(self, ts: Optional[int] = None, close: Optional[float] = None) -> Indicators:
+        """Current indicators, previewing a provisional ``close`` for ``ts`` when given."""
+
+        ret = close / self.last_close - 1 if close is not None and self.last_close else None
+        latest = close if close is not None else self.last_close
+        ath = max(self.ath, latest or 0.0)
+        return {
+            "as_of": ts if close is not None else self.last_ts,
+            "close": latest,
+            "ath": ath,
+            "drawdown_pct": round((latest / ath - 1) * 100, 4) if latest and ath else 0.0,
+            "windows": {
+                str(size): window.snapshot(close, ret) for size, window in self.windows.items()
+            },
+        }
+
+
+class SeriesIndicators:
+    """Keeps an :class:`IndicatorEngine` in step with a series, feeding only new days."""
+
+    def __init__(self, windows: Sequence[int] = DEFAULT_WINDOWS) -> None:
+        self.windows = tuple(windows)
+        self.engine = IndicatorEngine(self.windows)
+        self._committed = 0
+        self._report_key: Optional[Tuple[object, int]] = None
+        self._report: Optional[Indicators] = None
+        self._lock = threading.Lock()
+
+    def report(self, view: SeriesView, today: int) -> Indicators:
+        """Indicators for ``view``; days before UTC day ``today`` are committed, today is previewed."""
+
+        key = (view.version, today)
+        if key == self._report_key and self._report is not None:
+            return self._report
+        with self._lock:
+            ts, closes = view.timestamps, view.prices
+            complete = int(np.searchsorted(ts, today * DAY_MS, side="left"))
+            engine = self.engine
+            if not self._still_prefix(ts, closes, complete):
+                engine = self.engine = IndicatorEngine(self.windows)
+                self._committed = 0
+            engine.extend(zip(ts[self._committed:complete].tolist(), closes[self._committed:complete].tolist()))
+            self._committed = complete
+            if complete < len(ts):
+                report = engine.report(int(ts[-1]), float(closes[-1]))
+            else:
+                report = engine.report()
+            self._report_key, self._report = key, report
+            return report
+
+    def _still_prefix(self, ts: np.ndarray, closes: np.ndarray, complete: int) -> bool:
+        """True when the committed closes are unchanged in the new series (append-only update)."""
+
+        done = self._committed
+        if done == 0:
+            return True
+        if done > complete:
+            return False
+        return int(ts[done - 1]) == self.engine.last_ts and float(closes[done - 1]) == self.engine.last_close
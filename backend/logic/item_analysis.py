@@ -0,0 +1,222 @@
+"""
+Per-question item analysis for the course quizzes.
+Each graded batch is reduced with NumPy to running sums (attempts, correct
+answers, option histogram and the score sums behind the point-biserial), and
+those are added to counters in ``quizzes.db`` in one transaction. Writing is
+O(questions x options) per batch regardless of its size, and reports are
+computed from the counters alone in O(questions).
+"""
+
+import logging
+import math
+import os
+import sqlite3
+import time
+from functools import partial
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from backend.logic.process_local import ThreadLocalConnection, open_sqlite
+from backend.logic.quiz_grader import ANSWER_KEYS, UNANSWERED, GradedBatch
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+DEFAULT_DB_PATH = Path(os.getenv("QUIZ_STATS_DB_PATH", BASE_DIR / "database" / "quizzes.db"))
+
+logger = logging.getLogger(__name__)
+
+Report = Dict[str, object]
+
+
+class ItemStatsStore:
+    def __init__(self, path: Optional[Path] = None) -> None:
+        self.path = Path(path or DEFAULT_DB_PATH)
+        self._db = ThreadLocalConnection(partial(open_sqlite, self.path), setup=self._create_schema)
+
+    def _create_schema(self, conn: sqlite3.Connection) -> None:
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS quiz_totals (
+                course_id TEXT PRIMARY KEY,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                score_sum INTEGER NOT NULL DEFAULT 0,
+                score_sq_sum INTEGER NOT NULL DEFAULT 0,
+                updated_at INTEGER NOT NULL
+            ) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS question_totals (
+                course_id TEXT NOT NULL,
+                question INTEGER NOT NULL,
+                correct INTEGER NOT NULL DEFAULT 0,
+                correct_score_sum INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (course_id, question)
+            ) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS option_counts (
+                course_id TEXT NOT NULL,
+                question INTEGER NOT NULL,
+                option INTEGER NOT NULL,
+                picks INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (course_id, question, option)
+            ) WITHOUT ROWID;
+            """
+        )
+
+    def record(self, batch: GradedBatch) -> None:
+        """Fold a graded batch into the counters for its course."""
+
+        if not len(batch) or not batch.total:
+            return
+        course_id = batch.key.course_id
+        scores = batch.correct.astype(np.int64)
+        matches = batch.matches
+        correct = matches.sum(axis=0)
+        correct_score_sum = (matches * scores[:, None]).sum(axis=0)
+        question_rows = [
+            (course_id, question, int(correct[question]), int(correct_score_sum[question]))
+            for question in range(batch.total)
+        ]
+        option_rows = []
+        for question in range(batch.total):
+            options, picks = np.unique(batch.submitted[:, question], return_counts=True)
+            option_rows.extend(
+                (course_id, question, int(option), int(count)) for option, count in zip(options, picks)
+            )
+
+        conn = self._db.get()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute(
+                """
+                INSERT INTO quiz_totals (course_id, attempts, score_sum, score_sq_sum, updated_at)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT (course_id) DO UPDATE SET
+                    attempts = attempts + excluded.attempts,
+                    score_sum = score_sum + excluded.score_sum,
+                    score_sq_sum = score_sq_sum + excluded.score_sq_sum,
+                    updated_at = excluded.updated_at
+                """,
+                (course_id, len(scores), int(scores.sum()), int((scores * scores).sum()), int(time.time())),
+            )
+            conn.executemany(
+                """
+                INSERT INTO question_totals (course_id, question, correct, correct_score_sum)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT (course_id, question) DO UPDATE SET
+                    correct = correct + excluded.correct,
+                    correct_score_sum = correct_score_sum + excluded.correct_score_sum
+                """,
+                question_rows,
+            )
+            conn.executemany(
+                """
+                INSERT INTO option_counts (course_id, question, option, picks) VALUES (?, ?, ?, ?)
+                ON CONFLICT (course_id, question, option) DO UPDATE SET picks = picks + excluded.picks
+                """,
+                option_rows,
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def report(self, course_id: str) -> Optional[Report]:
+        """Difficulty and discrimination per question, from the stored counters only."""
+
+        key = ANSWER_KEYS.get(course_id)
+        if key is None:
+            return None
+        conn = self._db.get()
+        totals = conn.execute(
+            "SELECT attempts, score_sum, score_sq_sum, updated_at FROM quiz_totals WHERE course_id = ?",
+            (course_id,),
+        ).fetchone()
+        attempts, score_sum, score_sq_sum, updated_at = totals or (0, 0, 0, None)
+        question_totals = {
+            question: (correct, correct_score_sum)
+            for question, correct, correct_score_sum in conn.execute(
+                "SELECT question, correct, correct_score_sum FROM question_totals WHERE course_id = ?",
+                (course_id,),
+            )
+        }
+        histograms: Dict[int, Dict[str, int]] = {}
+        for question, option, picks in conn.execute(
+            "SELECT question, option, picks FROM option_counts WHERE course_id = ?", (course_id,)
+        ):
+            label = "unanswered" if option == UNANSWERED else str(option)
+            histograms.setdefault(question, {})[label] = picks
+
+        questions: List[Report] = []
+        variance_of_items = 0.0
+        for index, question in enumerate(key.questions):
+            correct, correct_score_sum = question_totals.get(index, (0, 0))
+            p = correct / attempts if attempts else None
+            if p is not None:
+                variance_of_items += p * (1 - p)
+            questions.append(
+                {
+                    "question": index,
+                    "prompt": question["prompt"],
+                    "answer": question["answer"],
+                    "attempts": attempts,
+                    "correct": correct,
+                    "difficulty": round(p, 4) if p is not None else None,
+                    "point_biserial": _point_biserial(attempts, score_sum, score_sq_sum, correct, correct_score_sum),
+                    # Corrected item-total correlation: the item itself is removed from each total score.
+                    "discrimination": _point_biserial(
+                        attempts,
+                        score_sum - correct,
+                        score_sq_sum - 2 * correct_score_sum + correct,
+                        correct,
+                        correct_score_sum - correct,
+                    ),
+                    "options": histograms.get(index, {}),
+                }
+            )
+
+        mean = score_sum / attempts if attempts else None
+        variance = score_sq_sum / attempts - mean * mean if attempts else 0.0
+        count = len(key.questions)
+        kr20 = None
+        if attempts and count > 1 and variance > 0:
+            kr20 = round(count / (count - 1) * (1 - variance_of_items / variance), 4)
+        return {
+            "course_id": course_id,
+            "questions_count": count,
+            "attempts": attempts,
+            "mean_score": round(mean, 4) if mean is not None else None,
+            "std_score": round(math.sqrt(max(variance, 0.0)), 4) if attempts else None,
+            "kr20": kr20,
+            "updated_at": updated_at,
+            "questions": questions,
+        }
+
+
+def _point_biserial(n: int, total: float, total_sq: float, correct: int, correct_total: float) -> Optional[float]:
+    """Point-biserial correlation between an item and a score from running sums (None when undefined)."""
+
+    if not n or correct in (0, n):
+        return None
+    variance = total_sq / n - (total / n) ** 2
+    if variance <= 0:
+        return None
+    mean_correct = correct_total / correct
+    mean_wrong = (total - correct_total) / (n - correct)
+    p = correct / n
+    return round((mean_correct - mean_wrong) / math.sqrt(variance) * math.sqrt(p * (1 - p)), 4)
+
+
+store = ItemStatsStore()
+
+
+def record_batch(batch: GradedBatch) -> None:
+    """Update item statistics; failures are logged so grading never depends on the stats store."""
+
+    try:
+        store.record(batch)
+    except Exception:  # noqa: BLE001
+        logger.exception("Could not record item statistics for %s", batch.key.course_id)
+
+
+def item_report(course_id: str) -> Optional[Report]:
+    return store.report(course_id)
@@ -1,4 +1,8 @@
+import hashlib
+import json
+import os
 import sqlite3
+import threading
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
@@ -9,6 +13,8 @@ from backend.logic.content_library import (
     OPERATIONS_LAB_LESSONS,
     SECURITY_ESSENTIALS_LESSONS,
 )
+from backend.logic.course_catalog import CourseCatalog, CourseRow, LessonRow
+from backend.logic.process_local import ThreadLocalConnection
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 DB_PATH = BASE_DIR / "database" / "lessons.db"
@@ -27,37 +33,110 @@ COURSE_TOPICS: Dict[str, Dict[str, List[str]]] = {
     key: {"title": value["title"], "topics": []} for key, value in COURSE_LIBRARY.items()
 }
 
+# Lessons are always served from the in-memory catalog. Set LESSON_BACKEND=sqlite
+# to persist the content in lessons.db and build the catalog from those rows.
+LESSON_BACKEND = os.getenv("LESSON_BACKEND", "memory").lower()
 
-def init_db() -> None:
-    DB_PATH.parent.mkdir(parents=True, exist_ok=True)
-    with sqlite3.connect(DB_PATH) as conn:
-        conn.execute(
-            """
-            CREATE TABLE IF NOT EXISTS courses (
-                id TEXT PRIMARY KEY,
-                title TEXT NOT NULL,
-                summary TEXT NOT NULL
-            );
-            """
-        )
-        conn.execute(
-            """
-            CREATE TABLE IF NOT EXISTS lessons (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                course_id TEXT NOT NULL,
-                lesson_order INTEGER NOT NULL,
-                title TEXT NOT NULL,
-                content TEXT NOT NULL,
-                examples TEXT NOT NULL,
-                glossary TEXT NOT NULL,
-                takeaways TEXT NOT NULL,
-                diagram TEXT NOT NULL,
-                UNIQUE(course_id, lesson_order)
-            );
-            """
-        )
-        conn.commit()
-    seed_data()
+# Bump when the table layout changes so existing databases are reseeded.
+SCHEMA_VERSION = 1
+
+# Read connections are cached per thread (per greenlet under gevent monkey-patching).
+MMAP_SIZE = 64 * 1024 * 1024
+STATEMENT_CACHE_SIZE = 64
+
+_init_lock = threading.Lock()
+_initialized = False
+_catalog_lock = threading.Lock()
+_catalog: Optional[CourseCatalog] = None
+
+
+def content_hash() -> str:
+    """Fingerprint the seed content so the database is only rewritten when it changes."""
+
+    payload = json.dumps(
+        {"schema": SCHEMA_VERSION, "courses": COURSE_LIBRARY, "lessons": LESSON_SETS},
+        sort_keys=True,
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _create_schema(conn: sqlite3.Connection) -> None:
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS meta (
+            key TEXT PRIMARY KEY,
+            value TEXT NOT NULL
+        );
+        """
+    )
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS courses (
+            id TEXT PRIMARY KEY,
+            title TEXT NOT NULL,
+            summary TEXT NOT NULL
+        );
+        """
+    )
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS lessons (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            course_id TEXT NOT NULL,
+            lesson_order INTEGER NOT NULL,
+            title TEXT NOT NULL,
+            content TEXT NOT NULL,
+            examples TEXT NOT NULL,
+            glossary TEXT NOT NULL,
+            takeaways TEXT NOT NULL,
+            diagram TEXT NOT NULL,
+            UNIQUE(course_id, lesson_order)
+        );
+        """
+    )
+
+
+def _stored_hash(conn: sqlite3.Connection) -> Optional[str]:
+    row = conn.execute("SELECT value FROM meta WHERE key = 'content_hash'").fetchone()
+    return row[0] if row else None
+
+
+def init_db(force: bool = False) -> None:
+    """Create the schema and reseed lessons when the content fingerprint changed.
+
+    Runs once per process; later calls are no-ops unless ``force`` is set.
+    """
+
+    global _initialized
+    if _initialized and not force:
+        return
+    with _init_lock:
+        if _initialized and not force:
+            return
+        DB_PATH.parent.mkdir(parents=True, exist_ok=True)
+        expected = content_hash()
+        conn = sqlite3.connect(DB_PATH, timeout=30, isolation_level=None)
+        try:
+            # WAL is persisted in the file and lets readers proceed during a reseed.
+            conn.execute("PRAGMA journal_mode = WAL")
+            # Take the write lock up front so concurrent workers seed at most once.
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                _create_schema(conn)
+                if force or _stored_hash(conn) != expected:
+                    seed_data(conn)
+                    conn.execute(
+                        "INSERT OR REPLACE INTO meta (key, value) VALUES ('content_hash', ?)",
+                        (expected,),
+                    )
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        finally:
+            conn.close()
+        _initialized = True
 
 
 def _lesson_payload(course_id: str, lesson: Lesson, lesson_order: int) -> Tuple:
@@ -81,81 +160,118 @@ def _lesson_payload(course_id: str, lesson: Lesson, lesson_order: int) -> Tuple:
     )
 
 
-def seed_data() -> None:
-    with sqlite3.connect(DB_PATH) as conn:
-        conn.row_factory = sqlite3.Row
-        for course_id, meta in COURSE_LIBRARY.items():
-            conn.execute("DELETE FROM lessons WHERE course_id = ?", (course_id,))
-            conn.execute(
-                "INSERT OR REPLACE INTO courses (id, title, summary) VALUES (?, ?, ?)",
-                (course_id, meta["title"], meta["summary"]),
-            )
-            lessons = LESSON_SETS.get(course_id, [])
-            for idx, lesson in enumerate(lessons, start=1):
-                conn.execute(
-                    """
-                    INSERT OR REPLACE INTO lessons (
-                        course_id, lesson_order, title, content, examples, glossary, takeaways, diagram
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                    """,
-                    _lesson_payload(course_id, lesson, idx),
-                )
-        conn.commit()
+def _course_rows() -> List[CourseRow]:
+    return [(course_id, meta["title"], meta["summary"]) for course_id, meta in COURSE_LIBRARY.items()]
 
 
-def list_courses() -> List[CourseInfo]:
+def _lesson_rows() -> List[LessonRow]:
+    return [
+        _lesson_payload(course_id, lesson, idx)
+        for course_id in COURSE_LIBRARY
+        for idx, lesson in enumerate(LESSON_SETS.get(course_id, []), start=1)
+    ]
+
+
+def seed_data(conn: sqlite3.Connection) -> None:
+    """Replace course and lesson rows with the content library on ``conn``.
+
+    The caller owns the transaction; see :func:`init_db`.
+    """
+
+    conn.execute("DELETE FROM lessons")
+    conn.execute("DELETE FROM courses")
+    conn.executemany("INSERT INTO courses (id, title, summary) VALUES (?, ?, ?)", _course_rows())
+    conn.executemany(
+        """
+        INSERT INTO lessons (
+            course_id, lesson_order, title, content, examples, glossary, takeaways, diagram
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        """,
+        _lesson_rows(),
+    )
+
+
+def _open_read_connection() -> sqlite3.Connection:
     init_db()
-    with sqlite3.connect(DB_PATH) as conn:
-        conn.row_factory = sqlite3.Row
-        cur = conn.execute("SELECT id, title, summary FROM courses ORDER BY title")
-        return [dict(row) for row in cur.fetchall()]
+    conn = sqlite3.connect(
+        f"{DB_PATH.as_uri()}?mode=ro",
+        uri=True,
+        cached_statements=STATEMENT_CACHE_SIZE,
+    )
+    conn.row_factory = sqlite3.Row
+    conn.execute(f"PRAGMA mmap_size = {MMAP_SIZE}")
+    conn.execute("PRAGMA query_only = ON")
+    return conn
+
+
+# One read-only connection per thread, opened on first use.
+_read_connections = ThreadLocalConnection(_open_read_connection)
+
+
+def close_connection() -> None:
+    """Close the calling thread's cached read connection, if any."""
+
+    _read_connections.close()
+
+
+def _load_catalog() -> CourseCatalog:
+    if LESSON_BACKEND != "sqlite":
+        return CourseCatalog(_course_rows(), _lesson_rows())
+    conn = _read_connections.get()
+    course_rows = conn.execute("SELECT id, title, summary FROM courses").fetchall()
+    lesson_rows = conn.execute(
+        """
+        SELECT course_id, lesson_order, title, content, examples, glossary, takeaways, diagram
+        FROM lessons
+        """
+    ).fetchall()
+    return CourseCatalog(course_rows, lesson_rows)
+
+
+def get_catalog() -> CourseCatalog:
+    """Return the process-wide catalog, building it on first use."""
+
+    global _catalog
+    if _catalog is None:
+        with _catalog_lock:
+            if _catalog is None:
+                _catalog = _load_catalog()
+    return _catalog
+
+
+def init_engine() -> None:
+    """Build the catalog (and seed SQLite when it is the backend) at startup."""
+
+    get_catalog()
+
+
+def list_courses() -> List[CourseInfo]:
+    return [course.to_dict() for course in get_catalog().courses()]
 
 
 def get_course(course_id: str) -> Optional[CourseInfo]:
-    init_db()
-    with sqlite3.connect(DB_PATH) as conn:
-        conn.row_factory = sqlite3.Row
-        cur = conn.execute("SELECT id, title, summary FROM courses WHERE id = ?", (course_id,))
-        row = cur.fetchone()
-        return dict(row) if row else None
+    course = get_catalog().course(course_id)
+    return course.to_dict() if course else None
 
 
 def list_lessons(course_id: str) -> List[Lesson]:
-    init_db()
-    with sqlite3.connect(DB_PATH) as conn:
-        conn.row_factory = sqlite3.Row
-        cur = conn.execute(
-            "SELECT lesson_order, title FROM lessons WHERE course_id = ? ORDER BY lesson_order",
-            (course_id,),
-        )
-        return [dict(row) for row in cur.fetchall()]
+    return [lesson.outline() for lesson in get_catalog().lessons(course_id)]
 
 
 def get_lesson(course_id: str, lesson_order: int) -> Optional[Lesson]:
-    init_db()
-    with sqlite3.connect(DB_PATH) as conn:
-        conn.row_factory = sqlite3.Row
-        cur = conn.execute(
-            """
-            SELECT lesson_order, title, content, examples, glossary, takeaways, diagram
-            FROM lessons WHERE course_id = ? AND lesson_order = ?
-            """,
-            (course_id, lesson_order),
-        )
-        row = cur.fetchone()
-        if not row:
-            return None
-        lesson = dict(row)
-        lesson["course_id"] = course_id
-        return lesson
+    lesson = get_catalog().lesson(course_id, lesson_order)
+    return lesson.to_dict() if lesson else None
+
+
+def lesson_version(course_id: str, lesson_order: int) -> Optional[str]:
+    """Digest of everything static on a lesson page: course outline, lesson body and links."""
+
+    lesson = get_catalog().lesson(course_id, lesson_order)
+    return lesson.digest if lesson else None
 
 
 def next_prev(course_id: str, lesson_order: int) -> Tuple[Optional[int], Optional[int]]:
-    lessons = list_lessons(course_id)
-    orders = [l["lesson_order"] for l in lessons]
-    if lesson_order not in orders:
+    lesson = get_catalog().lesson(course_id, lesson_order)
+    if not lesson:
         return None, None
-    idx = orders.index(lesson_order)
-    prev_order = orders[idx - 1] if idx > 0 else None
-    next_order = orders[idx + 1] if idx + 1 < len(orders) else None
-    return prev_order, next_order
+    return lesson.prev_order, lesson.next_order
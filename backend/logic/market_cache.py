@@ -0,0 +1,333 @@
+"""
+Cache backends for upstream market data (CoinGecko history/snapshot, exchange quotes).
+The SQLite and Redis backends are shared by every gunicorn worker on a host, so
+each upstream payload is fetched and stored once instead of once per process.
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from functools import partial
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+from backend.logic.process_local import ThreadLocalConnection, open_sqlite
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+DEFAULT_DB_PATH = BASE_DIR / "database" / "market_cache.db"
+
+logger = logging.getLogger(__name__)
+
+# Upper bound on one upstream fetch; other workers wait at most this long for the lease holder.
+LEASE_SECONDS = 30
+LEASE_POLL_SECONDS = 0.1
+
+# How long Redis keeps an entry after it is written; reads still apply their own TTL.
+RETENTION_SECONDS = 7 * 24 * 3600
+
+CacheEntry = Dict[str, object]
+
+
+class _Call:
+    __slots__ = ("event", "result", "error")
+
+    def __init__(self) -> None:
+        self.event = threading.Event()
+        self.result: object = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """Collapse concurrent calls for the same key in this process into one execution."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._calls: Dict[str, _Call] = {}
+        self.shared = 0
+
+    def in_flight(self, key: str) -> bool:
+        return key in self._calls
+
+    def do(self, key: str, fn: Callable[[], object]) -> object:
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            else:
+                self.shared += 1
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+        try:
+            call.result = fn()
+        except BaseException as exc:
+            call.error = exc
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.event.set()
+        return call.result
+
+
+class CacheBackend(ABC):
+    """Stores ``{"data": ..., "timestamp": ...}`` entries and fills them through :meth:`load`."""
+
+    name = "base"
+
+    def __init__(self) -> None:
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self._stats_lock = threading.Lock()
+        self._flight = SingleFlight()
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[CacheEntry]:
+        """Stored entry for ``key`` regardless of age, or None."""
+
+    @abstractmethod
+    def set(self, key: str, data: object, timestamp: Optional[float] = None) -> None:
+        """Store ``data`` for ``key``, stamped with ``timestamp`` (default now)."""
+
+    def acquire_lease(self, key: str, seconds: float) -> bool:
+        """Claim the right to refresh ``key``; shared backends arbitrate between workers."""
+
+        return True
+
+    def release_lease(self, key: str) -> None:
+        pass
+
+    def _count(self, field: str) -> None:
+        with self._stats_lock:
+            setattr(self, field, getattr(self, field) + 1)
+
+    def load(
+        self,
+        key: str,
+        ttl: float,
+        loader: Callable[[], object],
+        max_stale: Optional[float] = None,
+    ) -> object:
+        """Return cached data for ``key``, calling ``loader`` at most once at a time.
+
+        Entries younger than ``ttl`` are returned as-is. Entries younger than
+        ``max_stale`` (default ``10 * ttl``) are returned immediately while a
+        background thread refreshes them. Otherwise the caller blocks on a
+        single in-flight fetch shared with every other caller for that key.
+        """
+
+        entry = self.get(key)
+        if entry is not None and is_valid(entry, ttl):
+            self._count("hits")
+            return entry["data"]
+        max_stale = ttl * 10 if max_stale is None else max_stale
+        if entry is not None and is_valid(entry, max_stale):
+            self._count("stale_hits")
+            self._refresh_in_background(key, loader)
+            return entry["data"]
+        self._count("misses")
+        return self._flight.do(key, lambda: self._fill(key, ttl, loader))
+
+    def _store(self, key: str, loader: Callable[[], object]) -> object:
+        try:
+            data = loader()
+            self.set(key, data)
+            return data
+        finally:
+            self.release_lease(key)
+
+    def _fill(self, key: str, ttl: float, loader: Callable[[], object]) -> object:
+        if self.acquire_lease(key, LEASE_SECONDS):
+            return self._store(key, loader)
+        # Another worker holds the lease: wait for it to publish, or take over if it gives up.
+        deadline = time.time() + LEASE_SECONDS
+        while time.time() < deadline:
+            time.sleep(LEASE_POLL_SECONDS)
+            entry = self.get(key)
+            if entry is not None and is_valid(entry, ttl):
+                return entry["data"]
+            if self.acquire_lease(key, LEASE_SECONDS):
+                return self._store(key, loader)
+        data = loader()
+        self.set(key, data)
+        return data
+
+    def refresh(self, key: str, loader: Callable[[], object]) -> bool:
+        """Reload ``key`` now unless another worker holds its lease; True when this call stored it."""
+
+        if not self.acquire_lease(key, LEASE_SECONDS):
+            return False
+        self._store(key, loader)
+        return True
+
+    def _refresh_in_background(self, key: str, loader: Callable[[], object]) -> None:
+        flight_key = f"refresh:{key}"
+        if self._flight.in_flight(flight_key):
+            return
+
+        def run() -> None:
+            try:
+                self._flight.do(flight_key, lambda: self.refresh(key, loader))
+            except Exception:  # noqa: BLE001
+                logger.warning("Background refresh of %s failed", key, exc_info=True)
+
+        threading.Thread(target=run, name=f"cache-refresh:{key}", daemon=True).start()
+
+    def stats(self) -> Dict[str, object]:
+        total = self.hits + self.stale_hits + self.misses
+        return {
+            "backend": self.name,
+            "pid": os.getpid(),
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "coalesced": self._flight.shared,
+            "hit_rate": round((self.hits + self.stale_hits) / total, 4) if total else 0,
+        }
+
+
+def is_valid(entry: CacheEntry, ttl: float) -> bool:
+    return time.time() - entry.get("timestamp", 0) < ttl
+
+
+class MemoryCache(CacheBackend):
+    """Per-process dict store; the original behaviour, kept for single-worker runs."""
+
+    name = "memory"
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._entries: Dict[str, CacheEntry] = {}
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        return self._entries.get(key)
+
+    def set(self, key: str, data: object, timestamp: Optional[float] = None) -> None:
+        self._entries[key] = {"data": data, "timestamp": timestamp or time.time()}
+
+
+class SQLiteCache(CacheBackend):
+    """Host-wide store in a WAL-mode SQLite file shared by all workers."""
+
+    name = "sqlite"
+
+    def __init__(self, path: Optional[Path] = None) -> None:
+        super().__init__()
+        self.path = Path(path or DEFAULT_DB_PATH)
+        self._db = ThreadLocalConnection(partial(open_sqlite, self.path))
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with sqlite3.connect(self.path, timeout=30) as conn:
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS cache_entries (
+                    key TEXT PRIMARY KEY,
+                    value BLOB NOT NULL,
+                    stored_at REAL NOT NULL
+                );
+                """
+            )
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS cache_leases (
+                    key TEXT PRIMARY KEY,
+                    owner INTEGER NOT NULL,
+                    expires_at REAL NOT NULL
+                );
+                """
+            )
+        conn.close()
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        row = self._db.get().execute(
+            "SELECT value, stored_at FROM cache_entries WHERE key = ?", (key,)
+        ).fetchone()
+        if not row:
+            return None
+        return {"data": json.loads(row[0]), "timestamp": row[1]}
+
+    def set(self, key: str, data: object, timestamp: Optional[float] = None) -> None:
+        value = json.dumps(data, separators=(",", ":")).encode("utf-8")
+        self._db.get().execute(
+            "INSERT OR REPLACE INTO cache_entries (key, value, stored_at) VALUES (?, ?, ?)",
+            (key, value, timestamp or time.time()),
+        )
+
+    def acquire_lease(self, key: str, seconds: float) -> bool:
+        conn = self._db.get()
+        now = time.time()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute("DELETE FROM cache_leases WHERE key = ? AND expires_at < ?", (key, now))
+            cur = conn.execute(
+                "INSERT OR IGNORE INTO cache_leases (key, owner, expires_at) VALUES (?, ?, ?)",
+                (key, os.getpid(), now + seconds),
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return cur.rowcount == 1
+
+    def release_lease(self, key: str) -> None:
+        self._db.get().execute(
+            "DELETE FROM cache_leases WHERE key = ? AND owner = ?", (key, os.getpid())
+        )
+
+
+class RedisCache(CacheBackend):
+    """Store entries in Redis (or any server speaking its protocol); needs the ``redis`` package."""
+
+    name = "redis"
+
+    def __init__(self, url: Optional[str] = None, prefix: str = "adaptbtc:market:") -> None:
+        super().__init__()
+        try:
+            import redis
+        except ImportError as exc:  # pragma: no cover - optional dependency
+            raise RuntimeError("MARKET_CACHE_BACKEND=redis requires the 'redis' package") from exc
+        self.client = redis.Redis.from_url(url or os.getenv("REDIS_URL", "redis://localhost:6379/0"))
+        self.prefix = prefix
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        raw = self.client.get(self.prefix + key)
+        if raw is None:
+            return None
+        stored = json.loads(raw)
+        return {"data": stored["d"], "timestamp": stored["t"]}
+
+    def set(self, key: str, data: object, timestamp: Optional[float] = None) -> None:
+        value = json.dumps({"t": timestamp or time.time(), "d": data}, separators=(",", ":"))
+        self.client.set(self.prefix + key, value, ex=RETENTION_SECONDS)
+
+    def acquire_lease(self, key: str, seconds: float) -> bool:
+        return bool(self.client.set(f"{self.prefix}lease:{key}", os.getpid(), nx=True, ex=int(seconds)))
+
+    def release_lease(self, key: str) -> None:
+        self.client.delete(f"{self.prefix}lease:{key}")
+
+
+BACKENDS = {
+    "memory": MemoryCache,
+    "sqlite": SQLiteCache,
+    "redis": RedisCache,
+}
+
+
+def create_cache(kind: Optional[str] = None) -> CacheBackend:
+    """Build the backend named by ``kind`` or MARKET_CACHE_BACKEND (default ``sqlite``)."""
+
+    kind = (kind or os.getenv("MARKET_CACHE_BACKEND", "sqlite")).lower()
+    if kind not in BACKENDS:
+        raise RuntimeError(f"Unknown market cache backend: {kind}")
+    if kind == "sqlite" and os.getenv("MARKET_CACHE_PATH"):
+        return SQLiteCache(Path(os.environ["MARKET_CACHE_PATH"]))
+    return BACKENDS[kind]()
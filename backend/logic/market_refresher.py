@@ -0,0 +1,110 @@
+"""
+Background refresher that keeps hot market data keys warm in the shared cache.
+Each job reloads its key shortly before the TTL runs out, with jitter so workers
+do not stampede together and exponential backoff while the upstream is failing.
+"""
+
+import logging
+import os
+import random
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+from backend.logic.market_cache import CacheBackend
+
+logger = logging.getLogger(__name__)
+
+JITTER_SECONDS = 5.0
+BASE_BACKOFF_SECONDS = 5.0
+MAX_BACKOFF_SECONDS = 600.0
+# Recheck interval when another worker holds the refresh lease.
+LEASE_RETRY_SECONDS = 5.0
+
+
+class RefreshJob:
+    __slots__ = ("key", "ttl", "loader", "lead", "failures", "next_run")
+
+    def __init__(self, key: str, ttl: float, loader: Callable[[], object], lead: float) -> None:
+        self.key = key
+        self.ttl = ttl
+        self.loader = loader
+        self.lead = lead
+        self.failures = 0
+        self.next_run = 0.0
+
+
+class MarketRefresher:
+    """Runs registered refresh jobs on a daemon thread in the current worker."""
+
+    def __init__(self, cache: CacheBackend, jitter: float = JITTER_SECONDS) -> None:
+        self.cache = cache
+        self.jitter = jitter
+        self.jobs: List[RefreshJob] = []
+        self._thread: Optional[threading.Thread] = None
+        self._pid: Optional[int] = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+
+    def add(
+        self, key: str, ttl: float, loader: Callable[[], object], lead: Optional[float] = None
+    ) -> None:
+        """Keep ``key`` warm, reloading it ``lead`` seconds (default ``min(30, ttl / 4)``) before expiry."""
+
+        self.jobs.append(RefreshJob(key, ttl, loader, min(30.0, ttl / 4) if lead is None else lead))
+
+    def ensure_running(self) -> None:
+        """Start the refresh thread for this process; cheap enough to call on every request."""
+
+        if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._loop, name="market-refresher", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def _schedule(self, job: RefreshJob, now: float) -> None:
+        entry = self.cache.get(job.key)
+        age = now - entry["timestamp"] if entry else job.ttl
+        job.next_run = now + max(0.0, job.ttl - age - job.lead) + random.uniform(0, self.jitter)
+
+    def run_pending(self, now: Optional[float] = None) -> None:
+        now = time.time() if now is None else now
+        for job in self.jobs:
+            if job.next_run > now:
+                continue
+            entry = self.cache.get(job.key)
+            if entry and now - entry["timestamp"] < job.ttl - job.lead:
+                # Another worker refreshed it recently.
+                self._schedule(job, now)
+                continue
+            try:
+                refreshed = self.cache.refresh(job.key, job.loader)
+            except Exception:  # noqa: BLE001
+                job.failures += 1
+                backoff = min(MAX_BACKOFF_SECONDS, BASE_BACKOFF_SECONDS * 2 ** (job.failures - 1))
+                job.next_run = now + backoff * random.uniform(0.5, 1.0)
+                logger.warning("Refreshing %s failed (attempt %d)", job.key, job.failures, exc_info=True)
+                continue
+            job.failures = 0
+            if refreshed:
+                self._schedule(job, time.time())
+            else:
+                job.next_run = now + LEASE_RETRY_SECONDS + random.uniform(0, self.jitter)
+
+    def _loop(self) -> None:
+        while not self._stop.is_set():
+            self.run_pending()
+            next_due = min((job.next_run for job in self.jobs), default=time.time() + 60)
+            self._stop.wait(max(0.5, min(60.0, next_due - time.time())))
+
+    def status(self) -> Dict[str, Dict[str, object]]:
+        return {
+            job.key: {"next_run": round(job.next_run, 1), "failures": job.failures} for job in self.jobs
+        }
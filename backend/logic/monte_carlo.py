@@ -0,0 +1,217 @@
+"""
+Monte Carlo projections for the DCA tool.
+Period returns are bootstrapped from (or fitted to) the stored daily closes and
+simulated for many paths at once with NumPy. Large runs can be split across a
+process pool, and results are memoized by parameter hash and data version.
+"""
+
+import hashlib
+import json
+import math
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import TimeoutError as FutureTimeout
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from backend.logic.dca_backtest import MAX_AMOUNT, MAX_INITIAL_BTC
+from backend.logic.price_series import SeriesView
+from backend.logic.process_local import SpawnedPool
+
+PERIOD_DAYS = {"daily": 1, "weekly": 7, "monthly": 30.4375}
+METHODS = ("bootstrap", "gbm")
+PERCENTILES = (5, 25, 50, 75, 95)
+
+MAX_PATHS = 50_000
+MAX_YEARS = 20
+# Total simulated elements (paths x steps) accepted per request, which bounds CPU time.
+MAX_ELEMENTS = 50_000_000
+# Output points per band; the simulation itself runs at the contribution frequency.
+BAND_POINTS = 121
+# Elements (paths x steps) simulated per chunk, which bounds peak memory.
+CHUNK_ELEMENTS = 2_000_000
+# Runs larger than this are split across the pool when MONTE_CARLO_WORKERS > 0.
+POOL_THRESHOLD_ELEMENTS = 20_000_000
+POOL_WORKERS = int(os.getenv("MONTE_CARLO_WORKERS", "0"))
+POOL_TIMEOUT_SECONDS = float(os.getenv("MONTE_CARLO_TIMEOUT_SECONDS", "60"))
+MAX_CACHED_RESULTS = 128
+
+Params = Dict[str, object]
+Projection = Dict[str, object]
+
+_results: "OrderedDict[str, Projection]" = OrderedDict()
+_results_lock = threading.Lock()
+_pool = SpawnedPool(POOL_WORKERS)
+
+
+class ProjectionUnavailable(RuntimeError):
+    """Raised when a pooled run times out or its worker pool has broken."""
+
+
+def parse_params(raw: Dict[str, object]) -> Params:
+    """Validate projection inputs; raises ``ValueError`` with a user-facing message."""
+
+    if not isinstance(raw, dict):
+        raise ValueError("Send the projection parameters as a JSON object")
+    try:
+        params = {
+            "amount": float(raw.get("amount", 100)),
+            "initial_btc": float(raw.get("initial_btc", 0)),
+            "goal_btc": float(raw["goal_btc"]) if raw.get("goal_btc") not in (None, "") else None,
+            "years": float(raw.get("years", 10)),
+            "paths": int(raw.get("paths", 10_000)),
+            "lookback_days": int(raw.get("lookback_days", 1460)),
+            "seed": int(raw.get("seed", 0)),
+        }
+    except (TypeError, ValueError, OverflowError) as exc:
+        raise ValueError("amount, initial_btc, goal_btc, years, paths, lookback_days and seed must be numbers") from exc
+    params["frequency"] = str(raw.get("frequency", "monthly")).lower()
+    params["method"] = str(raw.get("method", "bootstrap")).lower()
+    if params["frequency"] not in PERIOD_DAYS:
+        raise ValueError(f"frequency must be one of {', '.join(PERIOD_DAYS)}")
+    if params["method"] not in METHODS:
+        raise ValueError(f"method must be one of {', '.join(METHODS)}")
+    amounts = (params["amount"], params["initial_btc"], params["goal_btc"])
+    if not all(math.isfinite(value) for value in amounts if value is not None):
+        raise ValueError("amount, initial_btc and goal_btc must be finite numbers")
+    if params["amount"] < 0 or params["initial_btc"] < 0:
+        raise ValueError("amount and initial_btc cannot be negative")
+    if params["amount"] > MAX_AMOUNT or params["initial_btc"] > MAX_INITIAL_BTC:
+        raise ValueError(f"amount cannot exceed {MAX_AMOUNT:,} and initial_btc {MAX_INITIAL_BTC:,}")
+    if not 0 < params["years"] <= MAX_YEARS:
+        raise ValueError(f"years must be between 0 and {MAX_YEARS}")
+    if not 100 <= params["paths"] <= MAX_PATHS:
+        raise ValueError(f"paths must be between 100 and {MAX_PATHS}")
+    if params["lookback_days"] < 60:
+        raise ValueError("lookback_days must be at least 60")
+    if params["paths"] * _steps(params) > MAX_ELEMENTS:
+        raise ValueError(f"paths x periods cannot exceed {MAX_ELEMENTS:,}; use fewer paths or a coarser frequency")
+    return params
+
+
+def _steps(params: Params) -> int:
+    return max(1, int(round(params["years"] * 365.25 / PERIOD_DAYS[params["frequency"]])))
+
+
+def _period_returns(prices: np.ndarray, period_days: float) -> np.ndarray:
+    """Overlapping log returns over ``period_days`` (rounded to whole days)."""
+
+    k = max(1, int(round(period_days)))
+    log_prices = np.log(prices[np.isfinite(prices) & (prices > 0)])
+    if len(log_prices) <= k + 1:
+        raise ValueError("Not enough price history for this frequency")
+    return log_prices[k:] - log_prices[:-k]
+
+
+def simulate_chunk(
+    method: str,
+    samples: np.ndarray,
+    paths: int,
+    steps: int,
+    seed: Tuple[int, ...],
+    start_price: float,
+    amount: float,
+    initial_btc: float,
+    keep: np.ndarray,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Simulate ``paths`` price paths; returns (price, btc, value) at the ``keep`` step indices.
+
+    Contributions buy at the price at the start of each period and holdings are
+    valued at its end. Module-level so it can run in a process pool.
+    """
+
+    rng = np.random.default_rng(np.random.SeedSequence(seed))
+    if method == "bootstrap":
+        draws = rng.choice(samples, size=(paths, steps))
+    else:
+        mu, sigma = float(samples.mean()), float(samples.std())
+        draws = rng.normal(mu, sigma, size=(paths, steps))
+    prices = start_price * np.exp(np.cumsum(draws, axis=1))
+    buy_prices = np.empty_like(prices)
+    buy_prices[:, 0] = start_price
+    buy_prices[:, 1:] = prices[:, :-1]
+    btc = initial_btc + np.cumsum(amount / buy_prices, axis=1)
+    return prices[:, keep], btc[:, keep], btc[:, keep] * prices[:, keep]
+
+
+def _cache_key(params: Params, version: object) -> str:
+    raw = json.dumps({"params": params, "version": version}, sort_keys=True, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def project(view: SeriesView, params: Params) -> Projection:
+    """Run (or reuse) the projection for validated ``params`` over the series in ``view``."""
+
+    key = _cache_key(params, view.version)
+    with _results_lock:
+        if key in _results:
+            _results.move_to_end(key)
+            return _results[key]
+
+    period_days = PERIOD_DAYS[params["frequency"]]
+    history = np.asarray(view.prices[-params["lookback_days"]:], dtype=np.float64)
+    samples = _period_returns(history, period_days)
+    start_price = float(view.prices[-1])
+    steps = _steps(params)
+    paths = params["paths"]
+    keep = np.unique(np.linspace(0, steps - 1, min(steps, BAND_POINTS)).astype(np.int64))
+
+    chunk_paths = max(1, min(paths, CHUNK_ELEMENTS // steps))
+    chunks = []
+    for index, offset in enumerate(range(0, paths, chunk_paths)):
+        chunk = (
+            params["method"],
+            samples,
+            min(chunk_paths, paths - offset),
+            steps,
+            (params["seed"], index),
+            start_price,
+            params["amount"],
+            params["initial_btc"],
+            keep,
+        )
+        chunks.append(chunk)
+
+    use_pool = POOL_WORKERS > 0 and len(chunks) > 1 and paths * steps >= POOL_THRESHOLD_ELEMENTS
+    if use_pool:
+        pool = _pool.get()
+        try:
+            outputs = list(pool.map(simulate_chunk, *zip(*chunks), timeout=POOL_TIMEOUT_SECONDS))
+        except BrokenProcessPool as exc:
+            # A dead worker breaks the whole executor; the next run starts a fresh one.
+            _pool.discard(pool)
+            raise ProjectionUnavailable("projection workers crashed") from exc
+        except FutureTimeout as exc:
+            raise ProjectionUnavailable("projection timed out") from exc
+    else:
+        outputs = [simulate_chunk(*chunk) for chunk in chunks]
+    prices = np.concatenate([out[0] for out in outputs])
+    btc = np.concatenate([out[1] for out in outputs])
+    value = np.concatenate([out[2] for out in outputs])
+
+    def bands(matrix: np.ndarray, decimals: int) -> Dict[str, List[float]]:
+        levels = np.percentile(matrix, PERCENTILES, axis=0)
+        return {f"p{p}": np.round(row, decimals).tolist() for p, row in zip(PERCENTILES, levels)}
+
+    contributions = (keep + 1) * params["amount"]
+    result: Projection = {
+        "params": params,
+        "start_price": start_price,
+        "days": np.round((keep + 1) * period_days, 1).tolist(),
+        "invested": np.round(contributions, 2).tolist(),
+        "price": bands(prices, 2),
+        "btc": bands(btc, 8),
+        "value": bands(value, 2),
+        "parallel": use_pool,
+    }
+    if params["goal_btc"]:
+        result["goal_probability"] = np.round((btc >= params["goal_btc"]).mean(axis=0), 4).tolist()
+
+    with _results_lock:
+        _results[key] = result
+        if len(_results) > MAX_CACHED_RESULTS:
+            _results.popitem(last=False)
+    return result
@@ -0,0 +1,122 @@
+"""
+Columnar, memory-mapped file format for the daily BTC close series.
+Layout: a 16-byte header (magic, version, point count) followed by an int64
+timestamp column and a float64 price column. Every worker maps the same file,
+windows are zero-copy slices, and serialized JSON is cached per window.
+"""
+
+import json
+import os
+import struct
+import tempfile
+from pathlib import Path
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+
+from backend.logic.downsample import lttb
+
+MAGIC = b"BTCS"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<4sIQ")
+DAY_MS = 86_400_000
+
+# Distinct (window, resolution) pairs per data version whose JSON bytes are kept per process.
+MAX_CACHED_WINDOWS = 64
+
+
+def write_series(path: Path, timestamps: Sequence[int], prices: Sequence[float]) -> None:
+    """Atomically replace ``path``; processes still mapping the old file keep a valid view."""
+
+    ts = np.ascontiguousarray(timestamps, dtype="<i8")
+    px = np.ascontiguousarray(prices, dtype="<f8")
+    if ts.shape != px.shape:
+        raise ValueError("timestamps and prices must have the same length")
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=path.name, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as handle:
+            handle.write(HEADER.pack(MAGIC, FORMAT_VERSION, len(ts)))
+            handle.write(ts.tobytes())
+            handle.write(px.tobytes())
+        os.replace(tmp_name, path)
+    except BaseException:
+        os.unlink(tmp_name)
+        raise
+
+
+class SeriesView:
+    """One immutable mapping of a series file; swapped as a whole when the file changes."""
+
+    __slots__ = ("version", "timestamps", "prices", "_json")
+
+    def __init__(self, version: Optional[Tuple[int, int]], timestamps: np.ndarray, prices: np.ndarray) -> None:
+        self.version = version
+        self.timestamps = timestamps
+        self.prices = prices
+        self._json: Dict[Tuple[Optional[int], Optional[int]], bytes] = {}
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    def window(self, first_day: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Views of the points on or after UTC day ``first_day`` (all points when None)."""
+
+        if first_day is None:
+            return self.timestamps, self.prices
+        start = int(np.searchsorted(self.timestamps, first_day * DAY_MS, side="left"))
+        return self.timestamps[start:], self.prices[start:]
+
+    def window_json(self, first_day: Optional[int] = None, points: Optional[int] = None) -> bytes:
+        """``{"prices": [[ts, price], ...]}`` for the window, serialized once per data version.
+
+        When ``points`` is given the window is reduced to that many points with LTTB.
+        """
+
+        key = (first_day, points)
+        body = self._json.get(key)
+        if body is None:
+            ts, px = self.window(first_day)
+            if points:
+                ts, px = lttb(ts, px, points)
+            pairs = [list(point) for point in zip(ts.tolist(), px.tolist())]
+            body = json.dumps({"prices": pairs}, separators=(",", ":")).encode("utf-8")
+            if len(self._json) >= MAX_CACHED_WINDOWS:
+                self._json.clear()
+            self._json[key] = body
+        return body
+
+
+EMPTY_VIEW = SeriesView(None, np.empty(0, dtype="<i8"), np.empty(0, dtype="<f8"))
+
+
+class PriceSeries:
+    """Tracks a series file and remaps it whenever another process replaces it."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+        self._view = EMPTY_VIEW
+
+    def current(self) -> SeriesView:
+        """Return the view for the file on disk (``EMPTY_VIEW`` when it does not exist yet)."""
+
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return EMPTY_VIEW
+        version = (stat.st_ino, stat.st_mtime_ns)
+        view = self._view
+        if view.version == version:
+            return view
+        raw = np.memmap(self.path, dtype=np.uint8, mode="r")
+        magic, file_version, count = HEADER.unpack(raw[: HEADER.size].tobytes())
+        if magic != MAGIC or file_version != FORMAT_VERSION:
+            raise RuntimeError(f"Unsupported price series file: {self.path}")
+        ts_end = HEADER.size + count * 8
+        view = SeriesView(
+            version,
+            raw[HEADER.size:ts_end].view("<i8"),
+            raw[ts_end:ts_end + count * 8].view("<f8"),
+        )
+        self._view = view
+        return view
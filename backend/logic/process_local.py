@@ -0,0 +1,102 @@
+"""
+Resources that must not be shared across a fork.
+Gunicorn forks workers after the app (and these module-level objects) has been
+imported, so SQLite connections and executors are opened lazily and tagged
+with the PID that opened them; a child never reuses its parent's.
+"""
+
+import multiprocessing
+import os
+import sqlite3
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor
+from pathlib import Path
+from typing import Callable, Optional
+
+Setup = Callable[[sqlite3.Connection], None]
+
+
+def open_sqlite(
+    path: Path, isolation_level: Optional[str] = None, synchronous: Optional[str] = "NORMAL"
+) -> sqlite3.Connection:
+    """Connection with a 30 s busy timeout; autocommit unless ``isolation_level`` is given."""
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(path, timeout=30, isolation_level=isolation_level)
+    if synchronous:
+        conn.execute(f"PRAGMA synchronous = {synchronous}")
+    return conn
+
+
+class ThreadLocalConnection:
+    """One connection per thread from ``connect``; ``setup`` runs once, on the first connection opened."""
+
+    def __init__(self, connect: Callable[[], sqlite3.Connection], setup: Optional[Setup] = None) -> None:
+        self._connect = connect
+        self._setup = setup
+        self._local = threading.local()
+        self._ready = setup is None
+        self._ready_lock = threading.Lock()
+
+    def get(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is not None and self._local.pid == os.getpid():
+            return conn
+        conn = self._connect()
+        if not self._ready:
+            with self._ready_lock:
+                if not self._ready:
+                    self._setup(conn)
+                    self._ready = True
+        self._local.conn = conn
+        self._local.pid = os.getpid()
+        return conn
+
+    def close(self) -> None:
+        """Close the calling thread's connection, if it opened one."""
+
+        conn = getattr(self._local, "conn", None)
+        if conn is not None and self._local.pid == os.getpid():
+            conn.close()
+        self._local.conn = None
+
+
+class LazyExecutor:
+    """Executor from ``create``, built on first use and rebuilt in a forked child, which inherits no workers."""
+
+    def __init__(self, create: Callable[[], Executor]) -> None:
+        self._create = create
+        self._pool: Optional[Executor] = None
+        self._pid: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def get(self) -> Executor:
+        if self._pool is None or self._pid != os.getpid():
+            with self._lock:
+                if self._pool is None or self._pid != os.getpid():
+                    self._pool = self._create()
+                    self._pid = os.getpid()
+        return self._pool
+
+    def discard(self, pool: Executor) -> None:
+        """Forget a broken pool (unless another thread already replaced it) so the next call starts afresh."""
+
+        with self._lock:
+            if self._pool is pool:
+                self._pool = None
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    def shutdown(self) -> None:
+        if self._pool is not None and self._pid == os.getpid():
+            self._pool.shutdown(wait=True)
+        self._pool = None
+
+
+class SpawnedPool(LazyExecutor):
+    """Process pool whose workers are spawned, which avoids forking a threaded gunicorn worker."""
+
+    def __init__(self, workers: int) -> None:
+        super().__init__(
+            lambda: ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+        )
+        self.workers = workers
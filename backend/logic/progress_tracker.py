@@ -1,52 +1,187 @@
-from typing import Dict, List
+"""
+Learner progress in ``progress.db``.
+Every lesson view and completion is appended to ``progress_events``; in the
+same transaction the learner's ``course_progress`` row is updated in place, so
+dashboards read one row per course by primary key and cohort analytics only
+scan the aggregates, never the raw events.
+"""
+
+import os
+import sqlite3
+import time
+from functools import partial
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from backend.logic.process_local import ThreadLocalConnection, open_sqlite
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+DEFAULT_DB_PATH = Path(os.getenv("PROGRESS_DB_PATH", BASE_DIR / "database" / "progress.db"))
+
+# Longest single lesson session credited, so a tab left open overnight does not skew totals.
+MAX_TIME_SPENT_SECONDS = 4 * 3600
+
+CourseStats = Dict[str, Dict[str, object]]
+
+
+class ProgressStore:
+    def __init__(self, path: Optional[Path] = None) -> None:
+        self.path = Path(path or DEFAULT_DB_PATH)
+        self._db = ThreadLocalConnection(partial(open_sqlite, self.path), setup=self._create_schema)
+
+    def _create_schema(self, conn: sqlite3.Connection) -> None:
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS progress_events (
+                id INTEGER PRIMARY KEY,
+                learner TEXT NOT NULL,
+                course_id TEXT NOT NULL,
+                lesson_order INTEGER NOT NULL,
+                event TEXT NOT NULL,
+                time_spent INTEGER NOT NULL DEFAULT 0,
+                created_at INTEGER NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS lesson_completions (
+                learner TEXT NOT NULL,
+                course_id TEXT NOT NULL,
+                lesson_order INTEGER NOT NULL,
+                completed_at INTEGER NOT NULL,
+                PRIMARY KEY (learner, course_id, lesson_order)
+            ) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS course_progress (
+                learner TEXT NOT NULL,
+                course_id TEXT NOT NULL,
+                lessons_completed INTEGER NOT NULL DEFAULT 0,
+                last_lesson INTEGER NOT NULL DEFAULT 1,
+                views INTEGER NOT NULL DEFAULT 0,
+                time_spent INTEGER NOT NULL DEFAULT 0,
+                first_seen INTEGER NOT NULL,
+                last_seen INTEGER NOT NULL,
+                PRIMARY KEY (learner, course_id)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS idx_course_progress_course ON course_progress (course_id);
+            """
+        )
+
+    def record(self, learner: str, course_id: str, lesson_order: int, event: str, time_spent: int = 0) -> None:
+        """Append one event and fold it into the learner's course aggregate atomically."""
+
+        now = int(time.time())
+        time_spent = max(0, min(int(time_spent or 0), MAX_TIME_SPENT_SECONDS))
+        conn = self._db.get()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute(
+                "INSERT INTO progress_events (learner, course_id, lesson_order, event, time_spent, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (learner, course_id, lesson_order, event, time_spent, now),
+            )
+            newly_completed = 0
+            if event == "completed":
+                newly_completed = conn.execute(
+                    "INSERT OR IGNORE INTO lesson_completions (learner, course_id, lesson_order, completed_at) "
+                    "VALUES (?, ?, ?, ?)",
+                    (learner, course_id, lesson_order, now),
+                ).rowcount
+            conn.execute(
+                """
+                INSERT INTO course_progress
+                    (learner, course_id, lessons_completed, last_lesson, views, time_spent, first_seen, last_seen)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (learner, course_id) DO UPDATE SET
+                    lessons_completed = lessons_completed + excluded.lessons_completed,
+                    last_lesson = excluded.last_lesson,
+                    views = views + excluded.views,
+                    time_spent = time_spent + excluded.time_spent,
+                    last_seen = excluded.last_seen
+                """,
+                (learner, course_id, newly_completed, lesson_order, int(event == "viewed"), time_spent, now, now),
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def course_rows(self, learner: str) -> CourseStats:
+        rows = self._db.get().execute(
+            "SELECT course_id, lessons_completed, last_lesson, views, time_spent, last_seen "
+            "FROM course_progress WHERE learner = ?",
+            (learner,),
+        )
+        return {
+            course_id: {
+                "lessons_completed": lessons_completed,
+                "last_lesson": last_lesson,
+                "views": views,
+                "time_spent": time_spent,
+                "last_seen": last_seen,
+            }
+            for course_id, lessons_completed, last_lesson, views, time_spent, last_seen in rows
+        }
+
+    def last_lesson(self, learner: str, course_id: str) -> Optional[int]:
+        row = self._db.get().execute(
+            "SELECT last_lesson FROM course_progress WHERE learner = ? AND course_id = ?", (learner, course_id)
+        ).fetchone()
+        return row[0] if row else None
+
+    def completed_lessons(self, learner: str, course_id: str) -> List[int]:
+        rows = self._db.get().execute(
+            "SELECT lesson_order FROM lesson_completions WHERE learner = ? AND course_id = ? ORDER BY lesson_order",
+            (learner, course_id),
+        )
+        return [row[0] for row in rows]
+
+    def cohort_summary(self) -> CourseStats:
+        """Per-course learner counts, completions and time, from the aggregate rows only."""
+
+        rows = self._db.get().execute(
+            """
+            SELECT course_id, COUNT(*), SUM(lessons_completed), SUM(views), SUM(time_spent), MAX(last_seen)
+            FROM course_progress GROUP BY course_id
+            """
+        )
+        return {
+            course_id: {
+                "learners": learners,
+                "lessons_completed": completed_total,
+                "views": views,
+                "time_spent": time_spent,
+                "avg_lessons_completed": round(completed_total / learners, 2),
+                "avg_time_spent": round(time_spent / learners, 1),
+                "last_activity": last_seen,
+            }
+            for course_id, learners, completed_total, views, time_spent, last_seen in rows
+        }
 
-from flask import session
 
+store = ProgressStore()
 
-def _ensure_state() -> None:
-    session.setdefault("lesson_progress", {})
-    session.setdefault("course_state", {})
 
+def mark_complete(learner: str, course_id: str, lesson_order: int, time_spent: int = 0) -> None:
+    """Record a lesson completion and the time spent on it."""
 
-def mark_complete(username: str, course_id: str, lesson_order: int, time_spent: int = 0) -> None:
-    """Track lesson completion within the current browser session."""
+    store.record(learner, course_id, lesson_order, "completed", time_spent)
 
-    _ensure_state()
-    course_progress = session["lesson_progress"].setdefault(course_id, [])
-    if lesson_order not in course_progress:
-        course_progress.append(lesson_order)
-        course_progress.sort()
-    session["course_state"][course_id] = lesson_order
-    session.modified = True
 
+def record_last(learner: str, course_id: str, lesson_order: int) -> None:
+    """Record a lesson view; it becomes the learner's resume point for the course."""
 
-def record_last(username: str, course_id: str, lesson_order: int) -> None:
-    """Remember the most recent lesson for the current session."""
+    store.record(learner, course_id, lesson_order, "viewed")
 
-    _ensure_state()
-    session["course_state"][course_id] = lesson_order
-    session.modified = True
 
+def get_last(learner: str, course_id: str) -> int:
+    return store.last_lesson(learner, course_id) or 1
 
-def get_last(username: str, course_id: str) -> int:
-    _ensure_state()
-    return session["course_state"].get(course_id, 1)
 
+def completed(learner: str, course_id: str) -> List[int]:
+    return store.completed_lessons(learner, course_id)
 
-def completed(username: str, course_id: str) -> List[int]:
-    _ensure_state()
-    return session["lesson_progress"].get(course_id, [])
 
+def stats(learner: str) -> CourseStats:
+    return store.course_rows(learner)
 
-def stats(username: str) -> Dict[str, Dict[str, object]]:
-    _ensure_state()
-    summary: Dict[str, Dict[str, object]] = {}
-    for course_id, lessons in session["lesson_progress"].items():
-        summary[course_id] = {
-            "lessons_completed": len(lessons),
-            "last_lesson": session["course_state"].get(course_id, 1),
-        }
-    for course_id, last in session["course_state"].items():
-        summary.setdefault(course_id, {"lessons_completed": 0}).update({"last_lesson": last})
-    return summary
 
+def cohort_summary() -> CourseStats:
+    return store.cohort_summary()
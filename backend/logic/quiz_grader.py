@@ -1,5 +1,15 @@
+"""
+Quiz grading.
+Each quiz is compiled once at import into an answer-key array, so grading a
+batch of submissions is one vectorized comparison. Per-question feedback
+(prompt, options, explanation) is only built when something reads it.
+"""
+
+from collections import abc
 from datetime import datetime
-from typing import Dict, List, Tuple
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
 
 from backend.logic.content_library import (
     BITCOIN_101_QUIZ,
@@ -8,7 +18,6 @@ from backend.logic.content_library import (
 )
 
 Question = Dict[str, object]
-QUIZZES: Dict[str, List[Question]] = {}
 
 QUIZ_BANK: Dict[str, List[Question]] = {
     "bitcoin-101": BITCOIN_101_QUIZ,
@@ -17,46 +26,159 @@ QUIZ_BANK: Dict[str, List[Question]] = {
 }
 
 PASSING_SCORE = 0.8
+# Stored for a question left unanswered; never equals a real option index.
+UNANSWERED = -1
+MAX_OPTION = np.iinfo(np.int16).max
+
+
+def _in_range(answers: Sequence[int]) -> List[int]:
+    """Answers with values too large for int64 replaced by UNANSWERED (the slow path for hostile input)."""
+
+    return [answer if UNANSWERED <= answer <= MAX_OPTION else UNANSWERED for answer in answers]
+
+
+class AnswerKey:
+    """A course's questions plus their correct option indexes as an int16 array."""
+
+    __slots__ = ("course_id", "questions", "answers")
+
+    def __init__(self, course_id: str, questions: Sequence[Question]) -> None:
+        self.course_id = course_id
+        self.questions = tuple(questions)
+        self.answers = np.array([q["answer"] for q in self.questions], dtype=np.int16)
+
+    def __len__(self) -> int:
+        return len(self.questions)
+
+    def matrix(self, submissions: Iterable[Sequence[int]]) -> np.ndarray:
+        """Submissions as an ``(n, questions)`` int16 matrix, padded or truncated to the quiz length."""
+
+        total = len(self.questions)
+        if isinstance(submissions, np.ndarray) and submissions.ndim == 2:
+            rows = submissions
+        else:
+            rows = list(submissions)
+        matrix = np.full((len(rows), total), UNANSWERED, dtype=np.int16)
+        if len(rows) and (isinstance(rows, np.ndarray) or len({len(answers) for answers in rows}) == 1):
+            # Equal-length answer sheets (the usual case) convert in one step.
+            try:
+                values = np.asarray(rows, dtype=np.int64)[:, :total]
+            except OverflowError:
+                values = np.asarray([_in_range(answers) for answers in rows], dtype=np.int64)[:, :total]
+            values[(values < 0) | (values > MAX_OPTION)] = UNANSWERED
+            matrix[:, : values.shape[1]] = values
+            return matrix
+        for row, answers in zip(matrix, rows):
+            try:
+                values = np.asarray(answers[:total], dtype=np.int64)
+            except OverflowError:
+                values = np.asarray(_in_range(answers[:total]), dtype=np.int64)
+            values[(values < 0) | (values > MAX_OPTION)] = UNANSWERED
+            row[: len(values)] = values
+        return matrix
+
+
+class Feedback(abc.Sequence):
+    """Per-question result dicts for one submission, built on first access."""
+
+    def __init__(self, key: AnswerKey, answers: np.ndarray, matches: np.ndarray) -> None:
+        self._key = key
+        self._answers = answers
+        self._matches = matches
+        self._items: Optional[List[Dict[str, object]]] = None
+
+    def _build(self) -> List[Dict[str, object]]:
+        if self._items is None:
+            self._items = [
+                {
+                    "prompt": q["prompt"],
+                    "options": q["options"],
+                    "user_answer": int(answer),
+                    "correct_answer": q["answer"],
+                    "is_correct": bool(match),
+                    "explanation": q["explanation"],
+                }
+                for q, answer, match in zip(self._key.questions, self._answers, self._matches)
+            ]
+        return self._items
+
+    def __getitem__(self, index):
+        return self._build()[index]
+
+    def __len__(self) -> int:
+        return len(self._key)
+
+
+class GradedBatch:
+    """Scores for many submissions to one quiz; ``feedback(i)`` gives details for submission ``i``."""
+
+    def __init__(self, key: AnswerKey, submitted: np.ndarray) -> None:
+        self.key = key
+        self.submitted = submitted
+        self.matches = submitted == key.answers
+        self.correct = self.matches.sum(axis=1)
+        self.total = len(key)
+        self.scores = self.correct / self.total if self.total else np.zeros(len(submitted))
+        self.passed = self.scores >= PASSING_SCORE
+
+    def __len__(self) -> int:
+        return len(self.submitted)
+
+    def feedback(self, index: int) -> Feedback:
+        return Feedback(self.key, self.submitted[index], self.matches[index])
+
+    def summary(self) -> Dict[str, object]:
+        """Aggregate score statistics and the per-question correct rate for the batch."""
+
+        if not len(self.submitted):
+            return {"count": 0, "total": self.total}
+        scores = self.scores
+        return {
+            "count": len(self.submitted),
+            "total": self.total,
+            "mean_score": round(float(scores.mean()), 4),
+            "median_score": round(float(np.median(scores)), 4),
+            "min_score": round(float(scores.min()), 4),
+            "max_score": round(float(scores.max()), 4),
+            "std_score": round(float(scores.std()), 4),
+            "pass_rate": round(float(self.passed.mean()), 4),
+            "question_correct_rate": np.round(self.matches.mean(axis=0), 4).tolist(),
+        }
+
+
+def compile_quizzes(bank: Dict[str, List[Question]] = QUIZ_BANK) -> Dict[str, AnswerKey]:
+    return {course_id: AnswerKey(course_id, questions) for course_id, questions in bank.items()}
+
+
+ANSWER_KEYS: Dict[str, AnswerKey] = compile_quizzes()
+_EMPTY_KEY = AnswerKey("", ())
 
 
-def build_questions() -> None:
-    if QUIZZES:
-        return
-    for course, questions in QUIZ_BANK.items():
-        QUIZZES[course] = questions
+def get_questions(course_id: str) -> List[Question]:
+    return list(ANSWER_KEYS.get(course_id, _EMPTY_KEY).questions)
 
 
-def get_questions(course_id: str) -> List[Question]:
-    build_questions()
-    return QUIZZES.get(course_id, [])
-
-
-def grade(course_id: str, submitted: List[int]) -> Tuple[int, int, float, List[Dict[str, object]]]:
-    build_questions()
-    questions = QUIZZES.get(course_id, [])
-    correct = 0
-    graded: List[Dict[str, object]] = []
-    for idx, q in enumerate(questions):
-        user_answer = submitted[idx] if idx < len(submitted) else -1
-        is_correct = user_answer == q["answer"]
-        if is_correct:
-            correct += 1
-        graded.append(
-            {
-                "prompt": q["prompt"],
-                "options": q["options"],
-                "user_answer": user_answer,
-                "correct_answer": q["answer"],
-                "is_correct": is_correct,
-                "explanation": q["explanation"],
-            }
-        )
-    total = len(questions)
-    score = correct / total if total else 0
-    return correct, total, score, graded
-
-
-def save_attempt(username: str, course_id: str, correct: int, total: int, graded: List[Dict[str, object]]) -> None:
+def grade_many(course_id: str, submissions: Iterable[Sequence[int]]) -> GradedBatch:
+    """Grade every submission (a list of chosen option indexes) in one vectorized pass."""
+
+    key = ANSWER_KEYS.get(course_id, _EMPTY_KEY)
+    return GradedBatch(key, key.matrix(submissions))
+
+
+def grade(
+    course_id: str, submitted: List[int], on_graded: Optional[Callable[[GradedBatch], None]] = None
+) -> Tuple[int, int, float, Sequence[Dict[str, object]]]:
+    """Grade one answer sheet; ``on_graded`` receives the one-row batch (e.g. to record item statistics)."""
+
+    batch = grade_many(course_id, [submitted])
+    if on_graded is not None:
+        on_graded(batch)
+    return int(batch.correct[0]), batch.total, float(batch.scores[0]), batch.feedback(0)
+
+
+def save_attempt(
+    username: str, course_id: str, correct: int, total: int, graded: Sequence[Dict[str, object]]
+) -> None:
     from flask import session
 
     session.setdefault("quiz_attempts", {})
@@ -0,0 +1,227 @@
+"""
+Server-side Flask sessions.
+Session data (lesson progress, course state, quiz attempts, flashes) stays on
+the server, marshalled to a compact binary blob; the cookie carries only a
+random session ID. Unmodified sessions cost one primary-key read per request
+and no write or Set-Cookie.
+"""
+
+import marshal
+import os
+import pickle
+import secrets
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from functools import partial
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from flask.sessions import SecureCookieSessionInterface, SessionInterface, SessionMixin
+from werkzeug.datastructures import CallbackDict
+
+from backend.logic.process_local import ThreadLocalConnection, open_sqlite
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+DEFAULT_DB_PATH = BASE_DIR / "database" / "progress.db"
+
+# Stored sessions expire after this long without a write.
+SESSION_LIFETIME_SECONDS = int(os.getenv("SESSION_LIFETIME_SECONDS", str(30 * 24 * 3600)))
+# Reads re-save an unmodified session once less than this much of its lifetime is left.
+REFRESH_WINDOW_SECONDS = SESSION_LIFETIME_SECONDS // 2
+MEMORY_MAX_SESSIONS = int(os.getenv("SESSION_MEMORY_MAX", "10000"))
+# One in this many SQLite writes also purges expired rows.
+PURGE_EVERY = 256
+
+_MARSHAL = b"m"
+_PICKLE = b"p"
+
+StoredSession = Tuple[Dict[str, object], int]
+
+
+def encode(data: Dict[str, object]) -> bytes:
+    """Marshal plain session data; fall back to pickle for values marshal cannot store (e.g. Markup)."""
+
+    try:
+        return _MARSHAL + marshal.dumps(data)
+    except ValueError:
+        return _PICKLE + pickle.dumps(data, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def decode(blob: bytes) -> Dict[str, object]:
+    if blob[:1] == _MARSHAL:
+        return marshal.loads(blob[1:])
+    return pickle.loads(blob[1:])
+
+
+class ServerSideSession(CallbackDict, SessionMixin):
+    def __init__(
+        self,
+        initial: Optional[Dict[str, object]] = None,
+        sid: str = "",
+        new: bool = False,
+        needs_refresh: bool = False,
+    ) -> None:
+        def on_update(self: "ServerSideSession") -> None:
+            self.modified = True
+
+        super().__init__(initial, on_update)
+        self.sid = sid
+        self.new = new
+        self.needs_refresh = needs_refresh
+        self.modified = False
+
+
+class SessionBackend(ABC):
+    """Load/save/delete of encoded sessions by ID."""
+
+    @abstractmethod
+    def load(self, sid: str) -> Optional[StoredSession]:
+        """Session data and expiry for ``sid``, or None when missing or expired."""
+
+    @abstractmethod
+    def save(self, sid: str, data: Dict[str, object], expires: int) -> None:
+        """Store ``data`` under ``sid`` until the ``expires`` Unix time."""
+
+    @abstractmethod
+    def delete(self, sid: str) -> None:
+        """Remove ``sid``; missing sessions are ignored."""
+
+
+class MemorySessionBackend(SessionBackend):
+    """Per-process LRU; suitable for a single worker or local development."""
+
+    def __init__(self, max_sessions: int = MEMORY_MAX_SESSIONS) -> None:
+        self.max_sessions = max_sessions
+        self._entries: "OrderedDict[str, Tuple[bytes, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def load(self, sid: str) -> Optional[StoredSession]:
+        with self._lock:
+            entry = self._entries.get(sid)
+            if entry is None:
+                return None
+            if entry[1] < time.time():
+                del self._entries[sid]
+                return None
+            self._entries.move_to_end(sid)
+        return decode(entry[0]), entry[1]
+
+    def save(self, sid: str, data: Dict[str, object], expires: int) -> None:
+        blob = encode(data)
+        with self._lock:
+            self._entries[sid] = (blob, expires)
+            self._entries.move_to_end(sid)
+            while len(self._entries) > self.max_sessions:
+                self._entries.popitem(last=False)
+
+    def delete(self, sid: str) -> None:
+        with self._lock:
+            self._entries.pop(sid, None)
+
+
+class SQLiteSessionBackend(SessionBackend):
+    """Sessions in ``progress.db``, shared by every gunicorn worker on the host."""
+
+    def __init__(self, path: Optional[Path] = None) -> None:
+        self.path = Path(path or DEFAULT_DB_PATH)
+        self._db = ThreadLocalConnection(partial(open_sqlite, self.path))
+        self._writes = 0
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with sqlite3.connect(self.path, timeout=30) as conn:
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS sessions (
+                    sid TEXT PRIMARY KEY,
+                    data BLOB NOT NULL,
+                    expires INTEGER NOT NULL
+                ) WITHOUT ROWID
+                """
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_sessions_expires ON sessions (expires)")
+        conn.close()
+
+    def load(self, sid: str) -> Optional[StoredSession]:
+        row = self._db.get().execute(
+            "SELECT data, expires FROM sessions WHERE sid = ? AND expires >= ?", (sid, int(time.time()))
+        ).fetchone()
+        if row is None:
+            return None
+        return decode(row[0]), row[1]
+
+    def save(self, sid: str, data: Dict[str, object], expires: int) -> None:
+        conn = self._db.get()
+        conn.execute(
+            "INSERT OR REPLACE INTO sessions (sid, data, expires) VALUES (?, ?, ?)",
+            (sid, sqlite3.Binary(encode(data)), expires),
+        )
+        self._writes += 1
+        if self._writes % PURGE_EVERY == 0:
+            conn.execute("DELETE FROM sessions WHERE expires < ?", (int(time.time()),))
+
+    def delete(self, sid: str) -> None:
+        self._db.get().execute("DELETE FROM sessions WHERE sid = ?", (sid,))
+
+
+class ServerSideSessionInterface(SessionInterface):
+    def __init__(self, backend: SessionBackend, lifetime: int = SESSION_LIFETIME_SECONDS) -> None:
+        self.backend = backend
+        self.lifetime = lifetime
+
+    def open_session(self, app, request) -> ServerSideSession:
+        sid = request.cookies.get(self.get_cookie_name(app))
+        if sid:
+            stored = self.backend.load(sid)
+            if stored is not None:
+                data, expires = stored
+                # Sliding expiry without a write on every read.
+                return ServerSideSession(data, sid=sid, needs_refresh=expires - time.time() < REFRESH_WINDOW_SECONDS)
+        return ServerSideSession(sid=secrets.token_urlsafe(24), new=True)
+
+    def save_session(self, app, session: ServerSideSession, response) -> None:
+        name = self.get_cookie_name(app)
+        domain = self.get_cookie_domain(app)
+        path = self.get_cookie_path(app)
+        if not session:
+            if session.modified and not session.new:
+                self.backend.delete(session.sid)
+                response.delete_cookie(name, domain=domain, path=path)
+            return
+        if session.accessed:
+            response.vary.add("Cookie")
+        if not (session.modified or session.needs_refresh):
+            return
+        self.backend.save(session.sid, dict(session), int(time.time()) + self.lifetime)
+        if session.new or session.permanent:
+            response.set_cookie(
+                name,
+                session.sid,
+                expires=self.get_expiration_time(app, session),
+                httponly=self.get_cookie_httponly(app),
+                domain=domain,
+                path=path,
+                secure=self.get_cookie_secure(app),
+                samesite=self.get_cookie_samesite(app),
+            )
+
+
+BACKENDS = {
+    "sqlite": SQLiteSessionBackend,
+    "memory": MemorySessionBackend,
+}
+
+
+def create_session_interface(kind: Optional[str] = None) -> SessionInterface:
+    """Interface for ``kind`` or SESSION_BACKEND (default ``sqlite``); ``cookie`` keeps Flask's signed cookie."""
+
+    kind = (kind or os.getenv("SESSION_BACKEND", "sqlite")).lower()
+    if kind == "cookie":
+        return SecureCookieSessionInterface()
+    if kind not in BACKENDS:
+        raise RuntimeError(f"Unknown session backend: {kind}")
+    if kind == "sqlite" and os.getenv("SESSION_DB_PATH"):
+        return ServerSideSessionInterface(SQLiteSessionBackend(Path(os.environ["SESSION_DB_PATH"])))
+    return ServerSideSessionInterface(BACKENDS[kind]())
@@ -0,0 +1,106 @@
+"""
+Signal engine metrics for the /tools/signal-engine page.
+Momentum, volatility and heat are computed with NumPy over a window of the
+stored daily closes and memoized per (window, data version); only the cheap
+liquidity/confidence blend is recomputed from the latest snapshot.
+"""
+
+import threading
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from backend.logic.price_series import SeriesView
+
+# Distinct (data version, window) results kept before the memo is reset.
+MAX_MEMO_ENTRIES = 64
+
+Signals = Dict[str, object]
+
+_memo: Dict[Tuple[object, Optional[int]], Optional[Dict[str, float]]] = {}
+_memo_lock = threading.Lock()
+
+
+def _clamp(value: float, low: float = 0, high: float = 100) -> float:
+    return max(low, min(high, value))
+
+
+def history_metrics(prices: np.ndarray) -> Optional[Dict[str, float]]:
+    """Momentum, return volatility and heat for a price window (None if under two points)."""
+
+    prices = prices[np.isfinite(prices)]
+    if len(prices) < 2:
+        return None
+    first = float(prices[0])
+    last = float(prices[-1])
+    avg_price = float(prices.mean())
+    momentum = (last - first) / first * 100
+
+    previous = prices[:-1]
+    nonzero = previous != 0
+    returns = prices[1:][nonzero] / previous[nonzero] - 1
+    volatility = float(returns.std()) if len(returns) else 0.0
+    volatility_pct = volatility * 100
+
+    return {
+        "first_price": first,
+        "last_price": last,
+        "avg_price": avg_price,
+        "momentum_pct": momentum,
+        "volatility": volatility,
+        "volatility_pct": volatility_pct,
+        "momentum_score": _clamp(50 + momentum * 0.8),
+        "stability_score": _clamp(100 - volatility_pct * 18, 10, 100),
+        "heat_score": _clamp(50 + (last - avg_price) / avg_price * 120),
+        "points": len(prices),
+    }
+
+
+def window_metrics(view: SeriesView, first_day: Optional[int]) -> Optional[Dict[str, float]]:
+    """Memoized :func:`history_metrics` for one window of a series version."""
+
+    key = (view.version, first_day)
+    if key in _memo:
+        return _memo[key]
+    _, prices = view.window(first_day)
+    metrics = history_metrics(prices)
+    with _memo_lock:
+        if len(_memo) >= MAX_MEMO_ENTRIES:
+            _memo.clear()
+        _memo[key] = metrics
+    return metrics
+
+
+def compute_signals(metrics: Dict[str, float], snapshot: Dict[str, object]) -> Signals:
+    """Blend window metrics with snapshot liquidity into the payload the page renders."""
+
+    market = snapshot.get("market_data") or {}
+    price = (market.get("current_price") or {}).get("usd") or 0
+    cap = (market.get("market_cap") or {}).get("usd") or 0
+    volume = (market.get("total_volume") or {}).get("usd") or 0
+    liquidity = _clamp(volume / cap * 1200) if cap else 0
+
+    confidence = round(
+        metrics["momentum_score"] * 0.35
+        + metrics["stability_score"] * 0.25
+        + liquidity * 0.25
+        + metrics["heat_score"] * 0.15
+    )
+    return {
+        "price": price,
+        "change_24h_pct": market.get("price_change_percentage_24h") or 0,
+        "market_cap": cap,
+        "volume": volume,
+        "avg_price": round(metrics["avg_price"], 2),
+        "momentum_pct": round(metrics["momentum_pct"], 4),
+        "volatility": round(metrics["volatility"], 6),
+        "volatility_pct": round(metrics["volatility_pct"], 4),
+        "points": metrics["points"],
+        "scores": {
+            "momentum": round(metrics["momentum_score"], 2),
+            "stability": round(metrics["stability_score"], 2),
+            "heat": round(metrics["heat_score"], 2),
+            "liquidity": round(liquidity, 2),
+        },
+        "confidence": confidence,
+    }
@@ -0,0 +1,68 @@
+"""
+Rendered lesson fragments and conditional-GET support for portal lesson pages.
+Only the sidebar completion markers vary per visitor, so the lesson body is
+rendered once per content version and the page ETag is derived from inputs.
+"""
+
+import hashlib
+from typing import Dict, Iterable, Optional, Tuple
+
+from flask import current_app, render_template
+from markupsafe import Markup
+
+BODY_TEMPLATE = "components/lesson-body.html"
+PAGE_TEMPLATES = (
+    "portal-lesson.html",
+    BODY_TEMPLATE,
+    "components/navbar.html",
+    "components/footer.html",
+)
+
+_fragments: Dict[Tuple[str, int, str], Markup] = {}
+_template_digest: Optional[str] = None
+
+
+def _templates_version() -> str:
+    """Fingerprint the page templates so a redeploy with new markup changes every ETag."""
+
+    global _template_digest
+    if _template_digest is None or current_app.debug:
+        env = current_app.jinja_env
+        digest = hashlib.sha256()
+        for name in PAGE_TEMPLATES:
+            source, _, _ = env.loader.get_source(env, name)
+            digest.update(source.encode("utf-8"))
+        _template_digest = digest.hexdigest()[:16]
+    return _template_digest
+
+
+def lesson_body(
+    course: Dict[str, object],
+    lesson: Dict[str, object],
+    prev_next: Tuple[Optional[int], Optional[int]],
+    version: str,
+) -> Markup:
+    """Return the lesson article HTML, rendering it only on the first request per version."""
+
+    key = (course["id"], lesson["lesson_order"], version)
+    body = _fragments.get(key)
+    if body is None or current_app.debug:
+        body = Markup(
+            render_template(BODY_TEMPLATE, course=course, current_lesson=lesson, prev_next=prev_next)
+        )
+        _fragments[key] = body
+    return body
+
+
+def lesson_etag(version: str, completed_lessons: Iterable[int]) -> str:
+    """Strong ETag covering everything the lesson page renders for this visitor."""
+
+    done = ",".join(str(order) for order in sorted(completed_lessons))
+    raw = f"{_templates_version()}|{version}|{done}"
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:32]
+
+
+def clear() -> None:
+    global _template_digest
+    _fragments.clear()
+    _template_digest = None
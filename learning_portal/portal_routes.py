@@ -1,13 +1,55 @@
+import hmac
+import json
+import os
+from concurrent.futures import TimeoutError as FutureTimeout
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
 from io import BytesIO
 from typing import List
 from uuid import uuid4
 
-from flask import Blueprint, flash, redirect, render_template, request, send_file, session, url_for
+from flask import (
+    Blueprint,
+    Response,
+    flash,
+    jsonify,
+    make_response,
+    redirect,
+    render_template,
+    request,
+    send_file,
+    session,
+    url_for,
+)
 
-from backend.logic.certificate_generator import generate_certificate
-from backend.logic.lesson_engine import get_course, get_lesson, list_courses, list_lessons, next_prev
+from backend.logic.certificate_generator import FORMATS
+from backend.logic.certificate_ids import SigningKeyMissing, sign_certificate, verify_certificate
+from backend.logic.certificate_pool import CertificateQueueFull, CertificateRenderer
+from backend.logic.item_analysis import item_report, record_batch
+from backend.logic.lesson_engine import (
+    get_course,
+    get_lesson,
+    lesson_version,
+    list_courses,
+    list_lessons,
+    next_prev,
+)
 from backend.logic.progress_tracker import completed, get_last, mark_complete, record_last, stats
-from backend.logic.quiz_grader import PASSING_SCORE, get_attempts, get_questions, grade, save_attempt
+from backend.logic.quiz_grader import (
+    PASSING_SCORE,
+    get_attempts,
+    get_questions,
+    grade,
+    grade_many,
+    save_attempt,
+)
+from learning_portal.lesson_cache import lesson_body, lesson_etag
+
+_certificates = CertificateRenderer()
+# Largest answer-sheet batch accepted by the bulk grading endpoint.
+MAX_BATCH_SUBMISSIONS = 1000
+# Answers outside [-1, MAX_ANSWER_VALUE) are rejected before they reach NumPy's int64 arrays.
+MAX_ANSWER_VALUE = 2**15
 
 portal = Blueprint(
     "portal",
@@ -24,6 +66,53 @@ def _visitor_name() -> str:
     return session.get("learner_alias", "Open Learner")
 
 
+def _learner_id() -> str:
+    """Stable per-visitor key for stored progress; the alias is only for display."""
+
+    if "learner_id" not in session:
+        session["learner_id"] = uuid4().hex
+    return session["learner_id"]
+
+
+def _render_lesson_page(course, lesson_data, learner: str):
+    """Render a lesson page from the cached body, answering 304 when the ETag matches."""
+
+    course_id = course["id"]
+    completed_lessons = completed(learner, course_id)
+    if not lesson_data:
+        return render_template(
+            "portal-lesson.html",
+            course=course,
+            lessons=list_lessons(course_id),
+            current_lesson=None,
+            completed_lessons=completed_lessons,
+            lesson_body=None,
+        )
+
+    order = lesson_data["lesson_order"]
+    version = lesson_version(course_id, order)
+    etag = lesson_etag(version, completed_lessons)
+    if request.if_none_match.contains_weak(etag):
+        response = make_response("", 304)
+    else:
+        body = lesson_body(course, lesson_data, next_prev(course_id, order), version)
+        response = make_response(
+            render_template(
+                "portal-lesson.html",
+                course=course,
+                lessons=list_lessons(course_id),
+                current_lesson=lesson_data,
+                completed_lessons=completed_lessons,
+                lesson_body=body,
+            )
+        )
+    response.set_etag(etag)
+    # Per-visitor page: browsers may keep it but must revalidate on every view.
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    return response
+
+
 @portal.route("/login", methods=["GET", "POST"])
 def login():
     flash("Open access — no login required. Jump straight into the lessons.", "info")
@@ -45,7 +134,7 @@ def logout():
 @portal.route("/dashboard")
 def dashboard():
     username = _visitor_name()
-    course_summary = stats(username)
+    course_summary = stats(_learner_id())
     courses = list_courses()
     lesson_totals = {course["id"]: len(list_lessons(course["id"])) for course in courses}
     return render_template(
@@ -68,17 +157,9 @@ def course_detail(course_id):
     if not course:
         flash("Course not found.", "warning")
         return redirect(url_for("portal.courses"))
-    lesson_list = list_lessons(course_id)
-    user = _visitor_name()
-    last = get_last(user, course_id)
-    return render_template(
-        "portal-lesson.html",
-        course=course,
-        lessons=lesson_list,
-        current_lesson=get_lesson(course_id, last),
-        completed_lessons=completed(user, course_id),
-        prev_next=next_prev(course_id, last),
-    )
+    learner = _learner_id()
+    last = get_last(learner, course_id)
+    return _render_lesson_page(course, get_lesson(course_id, last), learner)
 
 
 @portal.route("/courses/<course_id>/lesson/<int:order>")
@@ -88,20 +169,18 @@ def lesson(course_id, order):
     if not course or not lesson_data:
         flash("Lesson not available.", "warning")
         return redirect(url_for("portal.courses"))
-    record_last(_visitor_name(), course_id, order)
-    return render_template(
-        "portal-lesson.html",
-        course=course,
-        lessons=list_lessons(course_id),
-        current_lesson=lesson_data,
-        completed_lessons=completed(_visitor_name(), course_id),
-        prev_next=next_prev(course_id, order),
-    )
+    learner = _learner_id()
+    record_last(learner, course_id, order)
+    return _render_lesson_page(course, lesson_data, learner)
 
 
 @portal.route("/courses/<course_id>/lesson/<int:order>/complete", methods=["POST"])
 def complete_lesson(course_id, order):
-    mark_complete(_visitor_name(), course_id, order, time_spent=120)
+    if not get_lesson(course_id, order):
+        flash("Lesson not available.", "warning")
+        return redirect(url_for("portal.courses"))
+    time_spent = request.form.get("time_spent", 0, type=int)
+    mark_complete(_learner_id(), course_id, order, time_spent=time_spent)
     flash("Lesson marked complete!", "success")
     return redirect(url_for("portal.lesson", course_id=course_id, order=order))
 
@@ -122,7 +201,7 @@ def submit_quiz(course_id):
     questions = get_questions(course_id)
     for idx, _ in enumerate(questions):
         answers.append(int(request.form.get(f"q{idx}", -1)))
-    correct, total, score, graded = grade(course_id, answers)
+    correct, total, score, graded = grade(course_id, answers, on_graded=record_batch)
     save_attempt(_visitor_name(), course_id, correct, total, graded)
     passed = score >= PASSING_SCORE
     if passed:
@@ -140,26 +219,137 @@ def submit_quiz(course_id):
     )
 
 
+@portal.post("/courses/<course_id>/quiz/batch")
+def grade_quiz_batch(course_id):
+    """Grade many answer sheets in one pass; streams one NDJSON line per sheet, then a summary line.
+
+    Only batches posted with the admin token are added to the item statistics.
+    """
+
+    if not get_course(course_id) or not get_questions(course_id):
+        return jsonify({"error": "Course not found."}), 404
+    data = request.get_json(silent=True)
+    raw = data.get("submissions") if isinstance(data, dict) else data
+    if not isinstance(raw, list) or not 1 <= len(raw) <= MAX_BATCH_SUBMISSIONS:
+        return jsonify({"error": f"submissions must be a list of 1 to {MAX_BATCH_SUBMISSIONS} answer sheets"}), 400
+    learners: List[object] = []
+    sheets: List[List[int]] = []
+    for index, item in enumerate(raw):
+        answers = item.get("answers") if isinstance(item, dict) else item
+        if not isinstance(answers, list) or not all(
+            isinstance(answer, int) and not isinstance(answer, bool) and -1 <= answer < MAX_ANSWER_VALUE
+            for answer in answers
+        ):
+            return jsonify({"error": f"submission {index}: answers must be a list of option indexes"}), 400
+        learners.append(item.get("learner") if isinstance(item, dict) else None)
+        sheets.append(answers)
+    include_feedback = bool(isinstance(data, dict) and data.get("include_feedback"))
+
+    batch = grade_many(course_id, sheets)
+    if _is_admin():
+        record_batch(batch)
+    correct = batch.correct.tolist()
+    scores = batch.scores.tolist()
+    passed = batch.passed.tolist()
+
+    def lines():
+        for index, learner in enumerate(learners):
+            row = {
+                "index": index,
+                "learner": learner,
+                "correct": correct[index],
+                "total": batch.total,
+                "score": round(scores[index], 4),
+                "passed": passed[index],
+            }
+            if include_feedback:
+                row["feedback"] = list(batch.feedback(index))
+            yield json.dumps(row) + "\n"
+        yield json.dumps({"summary": batch.summary()}) + "\n"
+
+    return Response(lines(), mimetype="application/x-ndjson")
+
+
+def _is_admin() -> bool:
+    """Bearer token check against PORTAL_ADMIN_TOKEN; admin endpoints are disabled (404) when it is unset."""
+
+    token = os.getenv("PORTAL_ADMIN_TOKEN", "")
+    supplied = request.headers.get("Authorization", "").removeprefix("Bearer ").strip()
+    return bool(token) and hmac.compare_digest(supplied.encode("utf-8"), token.encode("utf-8"))
+
+
+@portal.get("/admin/item-analysis/<course_id>")
+def item_analysis(course_id):
+    """Per-question difficulty and discrimination from the running counters."""
+
+    if not _is_admin():
+        return jsonify({"error": "Not found."}), 404
+    report = item_report(course_id)
+    if report is None:
+        return jsonify({"error": "Course not found."}), 404
+    return jsonify(report)
+
+
 @portal.route("/certificate/<course_id>")
 def certificate(course_id):
     course = get_course(course_id)
     if not course:
         flash("Course not found.", "warning")
         return redirect(url_for("portal.dashboard"))
-    verification_url = url_for("portal.dashboard", _external=True)
-    png_bytes = generate_certificate(_visitor_name(), course["title"], verification_url)
+    fmt = request.args.get("format", "png").lower()
+    if fmt not in FORMATS:
+        return f"Unsupported certificate format; use one of {', '.join(FORMATS)}.", 400
+    username = _visitor_name()
+    issued = datetime.utcnow().date()
+    try:
+        cert_id = sign_certificate(username, course_id, issued)
+    except SigningKeyMissing:
+        return "Certificates are unavailable until a signing key is configured.", 503
+    verification_url = url_for("portal.verify", cert_id=cert_id, _external=True)
+    try:
+        image_bytes = _certificates.render(username, course["title"], verification_url, fmt, issued)
+    except (CertificateQueueFull, FutureTimeout, BrokenProcessPool):
+        return "Certificates are busy right now; please retry in a few seconds.", 503, {"Retry-After": "5"}
+    _, mimetype, extension, _ = FORMATS[fmt]
     return send_file(
-        BytesIO(png_bytes),
-        mimetype="image/png",
+        BytesIO(image_bytes),
+        mimetype=mimetype,
         as_attachment=True,
-        download_name=f"{course_id}-certificate.png",
+        download_name=f"{course_id}-certificate.{extension}",
     )
 
 
+@portal.route("/verify/<cert_id>")
+def verify(cert_id):
+    try:
+        record = verify_certificate(cert_id)
+    except SigningKeyMissing:
+        return "Certificate verification is unavailable until a signing key is configured.", 503
+    if record is None:
+        status = 404
+    else:
+        status = 410 if record["revoked"] else 200
+    course = get_course(record["course_id"]) if record else None
+    if request.accept_mimetypes.best == "application/json":
+        if record is None:
+            return jsonify({"valid": False}), status
+        return jsonify(
+            {
+                "valid": not record["revoked"],
+                "revoked": record["revoked"],
+                "name": record["name"],
+                "course_id": record["course_id"],
+                "course": course["title"] if course else None,
+                "issued": record["issued"].isoformat(),
+            }
+        ), status
+    return render_template("portal-verify.html", record=record, course=course), status
+
+
 @portal.route("/progress")
 def progress():
     username = _visitor_name()
-    course_data = stats(username)
+    course_data = stats(_learner_id())
     for course in list_courses():
         course_data.setdefault(course["id"], {"lessons_completed": 0, "last_lesson": 1})
     attempts = {cid: get_attempts(username, cid) for cid in course_data.keys()}